@@ -7,21 +7,75 @@
 import os
 import zlib
 import sys
+import errno
+import time
+import random
+import re
+import bisect
+import copy
+import heapq
+import itertools
+import string
 from DirTree import DirTree
 from hashlib import sha1
+from functools import reduce
 
 #The list of all folders that are created as part of git init operation. 
-folderLst = ['branches', 'hooks', 'info', 'logs', 'objects\\info', 'objects\\pack', 'refs\\heads', 'refs\\tags']
+folderLst = ['branches', 'hooks', 'info', 'logs', os.path.join('objects', 'info'), os.path.join('objects', 'pack'), os.path.join('refs', 'heads'), os.path.join('refs', 'tags')]
 
 #The list of all the files (with relative path) created with the git init operation along with their corresponding content stored as a list of lists.
 fileLstWithContent = [['config', '[core]\n\trepositoryformatversion = 0\n\tfilemode = false\n\tbare = false\n\tlogallrefupdates = true\n\tsymlinks = false\n\tignorecase = true\n\thideDotFiles = dotGitOnly\n'],
 					['description', 'Unnamed repository; edit this file \'description\' to name the repository.\n'],
-					['HEAD', 'ref: refs\\heads\\master'],
-					['info\\exclude', "# git ls-files --others --exclude-from=.git/info/exclude\n# Lines that start with '#' are comments.\n# For a project mostly in C, the following would be a good set of\n# exclude patterns (uncomment them if you want to use them):\n# *.[oa]\n# *~\n"]
+					['HEAD', 'ref: refs/heads/master'],
+					[os.path.join('info', 'exclude'), "# git ls-files --others --exclude-from=.git/info/exclude\n# Lines that start with '#' are comments.\n# For a project mostly in C, the following would be a good set of\n# exclude patterns (uncomment them if you want to use them):\n# *.[oa]\n# *~\n"]
 					]
 #Setting a global variable representing the base directory of the project					
 currDir = os.getcwd()
 
+#The name of the file (directly under the git directory) holding the refs that have been packed out of the loose refs directory
+packedRefsFileName = "packed-refs"
+
+#In-process cache of resolved refs (refName => commitHash) along with the raw HEAD content, so that a single command does not re-read the same ref files
+refCache = {}
+
+#Sorted list of (refName, commitHash) tuples parsed from the packed-refs file. Stays None until the file is first read
+packedRefsLst = None
+
+#Mapping from 'section.key' (lower cased) to value for the entries of the git config file. Stays None until the file is first read
+configDict = None
+
+#Patterns matching the full magic bytes at the start of file formats that are already compressed. Blobs starting with any of these are stored without recompressing them
+#The formats with a short or text-like magic (bzip2, ID3, WEBP, MP4, Ogg, FLAC) are matched along with their version or header bytes so that ordinary text is not mistaken for them
+compressedFileSignatures = list(map(lambda x: re.compile(x, re.DOTALL), [rb'\x89PNG\r\n\x1a\n', rb'\xff\xd8\xff', rb'GIF8[79]a', rb'PK\x03\x04', rb'\x1f\x8b\x08', rb'BZh[1-9]1AY&SY',
+							rb'\xfd7zXZ\x00', rb'7z\xbc\xaf\x27\x1c', rb'\x28\xb5\x2f\xfd', rb'Rar!\x1a\x07', rb'OggS\x00', rb'fLaC[\x00\x80]\x00\x00\x22', rb'ID3[\x02-\x04]\x00',
+							rb'RIFF.{4}WEBP', rb'\x00\x00\x00.ftyp']))
+
+#The path (relative to the git directory) of the file holding the directory prefixes that make up the sparse checkout, one per line
+sparseCheckoutFileName = os.path.join("info", "sparse-checkout")
+
+#List of directory prefixes (with '/' as separator) parsed from the sparse checkout file. An empty list means the whole tree is checked out. Stays None until the file is first read
+sparsePatternLst = None
+
+#Number of leading bytes of a blob that are test compressed to detect incompressible content that has no known file signature
+compressionSampleSize = 65536
+
+#Default time (in milliseconds) to keep retrying when a lock file is held by another git process, used unless core.lockTimeout is set in the config
+defaultLockTimeout = 5000
+
+#Number of nested operations in this process currently holding the index lock. The lock file is only created and removed by the outermost one
+indexLockDepth = 0
+
+#Set when the index was written while holding the index lock without being flushed to disk. The outermost operation flushes it once before releasing the lock
+indexFlushPending = False
+
+#Raised when a lock file could not be created within the lock timeout because another git process is holding it (or has crashed while holding it)
+class LockTimeoutError(Exception):
+	pass
+
+#Raised when the fast-import stream contains a command, file mode or object reference that cannot be imported. The import is aborted without updating any ref
+class FastImportError(Exception):
+	pass
+
 # Helper Functions
 #Checks if the index files exist in the .git directory
 def indexFileExists():
@@ -37,61 +91,135 @@ def deleteFileIfExists(fPath):
 	if os.path.isfile(fPath):
 		os.remove(fPath)
 
-#Write content to the specified file
-def writeToFile(file, content, mode):
+#Encode the text of an index entry, tree object, commit object or ref to the bytes stored on disk. Paths that are not valid UTF-8 are carried through unchanged
+def encodeText(text):
+	return text.encode("utf-8", "surrogateescape")
+
+#Decode the bytes of an index entry, tree object, commit object or ref read from disk back to text
+def decodeText(content):
+	return content.decode("utf-8", "surrogateescape")
+
+#Write content to the specified file. Text content is encoded to bytes and everything is written in binary mode, so no newline translation ever takes place
+#The content goes to a uniquely named temporary file in the same directory which is then renamed over the target, so a crash or a concurrent reader never
+#sees a partially written file. The fsync flag additionally flushes the content to disk before the rename. Used for the files in the git directory, the working
+#copy files are written with writeWorkingCopyFile
+def writeToFile(file, content, fsync=False):
+	dirc = os.path.split(file)[0]
 	if not os.path.isfile(file):
 		try:
-			dirc = os.path.split(file)[0]
 			checkAndCreateDir(dirc)
 		except:
 			return
-	with open(file, mode) as f:
-		f.write(content)
+	tempFilePath = os.path.join(dirc, ".tmp-" + os.path.split(file)[1] + "-" + os.urandom(4).hex())
+	try:
+		with os.fdopen(os.open(tempFilePath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), "wb") as f:
+			f.write(content if isinstance(content, bytes) else encodeText(content))
+			if fsync:
+				f.flush()
+				os.fsync(f.fileno())
+		os.replace(tempFilePath, file)
+	except:
+		deleteFileIfExists(tempFilePath)
+		raise
 
-#Read content from the provided filename
+#Read content from the provided filename. The file is always read in binary mode, the content is returned as bytes for the 'rb' mode and decoded to text otherwise
 def readFromFile(fileName, readMode='r'):
-	content = ""
-	with open(fileName, readMode) as f:
+	with open(fileName, 'rb') as f:
 		content = f.read()
-	return content
+	return content if 'b' in readMode else decodeText(content)
 
-#Read content from the provided filename (using all available file modes) and decrypt its content using zlib library
+#Read the git object from the provided filename and decompress its content using zlib library. The content is returned as bytes
 def readFromFileAndDecompress(fileName):
-	content = ""
+	return zlib.decompress(readFromFile(fileName, 'rb'))
+
+#Read the git config file and return a mapping from 'section.key' to value. Git treats the section and key names case insensitively and so do we
+def readConfig():
+	global configDict
+	if configDict is None:
+		configDict, configPath = {}, os.path.join(currDir, ".git", "config")
+		fileContent = readFromFile(configPath).split("\n") if os.path.isfile(configPath) else []
+		sectionName = ""
+		for line in map(lambda x: x.strip(), fileContent):
+			if line.startswith("["):
+				sectionName = ".".join(map(lambda x: x.strip('"'), line.strip("[]").split(None, 1))).lower()
+			elif "=" in line and not line.startswith(("#", ";")):
+				key, value = line.split("=", 1)
+				configDict[sectionName + "." + key.strip().lower()] = value.strip()
+	return configDict
+
+#Get the zlib compression level used for loose objects. It is read from core.looseCompression, falling back to core.compression and finally to the zlib default
+#Values that are not a number or are outside of the valid -1 to 9 range are ignored
+def getLooseCompressionLevel():
+	config = readConfig()
 	try:
-		content = readFromFile(fileName, 'r')
-		return zlib.decompress(content)
-	except:
-		try:
-			content = readFromFile(fileName, 'rb')
-			return zlib.decompress(content)
-		except:
-			try:
-				content = readFromFile(fileName, 'rb')
-				content = content.replace("\r\n", "\n")
-				return zlib.decompress(content)
-			except:
-				return content
+		level = int(config.get("core.loosecompression", config.get("core.compression", "")))
+	except ValueError:
+		return zlib.Z_DEFAULT_COMPRESSION
+	return level if -1 <= level <= 9 else zlib.Z_DEFAULT_COMPRESSION
+
+#Check if the provided file content is already compressed, either by looking for a known file signature or by test compressing a sample of it
+def isIncompressibleContent(fileContent):
+	if any(map(lambda x: x.match(fileContent) is not None, compressedFileSignatures)):
+		return True
+	sample = fileContent[:compressionSampleSize]
+	return len(sample) >= 512 and len(zlib.compress(sample, 1)) >= len(sample) * 0.9
+
+#Compress the content of a git object using the configured loose compression level. For blobs the original file content is passed in as well and if it is
+#already compressed (images, archives etc.) the object is stored with level 0, since recompressing it only costs CPU without saving any space. The check is skipped
+#when the configured level is 0 anyway
+def compressGitObject(objContent, fileContent=None):
+	level = getLooseCompressionLevel()
+	if level != 0 and fileContent is not None and isIncompressibleContent(fileContent):
+		return zlib.compress(objContent, 0)
+	return zlib.compress(objContent, level)
+
+#Read the sparse checkout file and return the list of directory prefixes that should be present in the working copy. Returns an empty list when sparse checkout is disabled
+def getSparseCheckoutPatterns():
+	global sparsePatternLst
+	if sparsePatternLst is None:
+		sparseFilePath = os.path.join(currDir, ".git", sparseCheckoutFileName)
+		fileContent = readFromFile(sparseFilePath).split("\n") if os.path.isfile(sparseFilePath) else []
+		sparsePatternLst = list(filter(lambda x: x != "" and not x.startswith("#"), map(lambda x: x.strip().replace("\\", "/").strip("/"), fileContent)))
+	return sparsePatternLst
+
+#Convert the provided path (either full or relative to the project directory) to the '/' separated relative path that the sparse checkout patterns are matched against
+def getSparseRelPath(path):
+	relPath = os.path.relpath(path, currDir) if os.path.isabs(path) else path
+	return "" if relPath == os.curdir else "/".join(relPath.split(os.sep))
+
+#Check if the file with the provided path is part of the sparse checkout. Like git's cone mode, the files directly under the project directory are always included
+def isPathInSparseCheckout(path):
+	patternLst, relPath = getSparseCheckoutPatterns(), getSparseRelPath(path)
+	if not patternLst or "/" not in relPath:
+		return True
+	return any(map(lambda x: relPath.startswith(x + "/"), patternLst))
+
+#Check if the directory with the provided path needs to be traversed for the sparse checkout, i.e it is either within one of the patterns or is an ancestor of one
+def isDirInSparseCheckout(path):
+	patternLst, relPath = getSparseCheckoutPatterns(), getSparseRelPath(path)
+	if not patternLst or relPath == "":
+		return True
+	return any(map(lambda x: (relPath + "/").startswith(x + "/") or (x + "/").startswith(relPath + "/"), patternLst))
 
 #Get the root directory of provided file path
 def getRootDirectoryName(path):
-	return path[ : path.index("\\")]
+	return path[ : path.index(os.sep)]
 
 #Get the file and folder contents of the provided directory
 def getDirectoryContents(dirContentLst):
-	return map(lambda x: x[x.index("\\") + 1: ], dirContentLst)
+	return list(map(lambda x: x[x.index(os.sep) + 1: ], dirContentLst))
 
 #Create a tuple of list of files and list of folders from a combined list of the two
 def separateFilesAndFolder(contentLst):
-	fileLst = filter(lambda x: x.find("\\") == -1, contentLst)
-	folderLst = filter(lambda x: x.find("\\") != -1, contentLst)
+	fileLst = list(filter(lambda x: x.find(os.sep) == -1, contentLst))
+	folderLst = list(filter(lambda x: x.find(os.sep) != -1, contentLst))
 	return (fileLst, folderLst)
 
 #Group sub-directories on the basis of their root directories in a key-value pair collection
 def groupSubDirectories(dirLst):
 	folderDict = {}
 	mapFunc = lambda y: folderDict[getRootDirectoryName(y)].append(y) if (getRootDirectoryName(y) in folderDict) else (folderDict.setdefault(getRootDirectoryName(y), [y]))
-	map(mapFunc, dirLst)
+	list(map(mapFunc, dirLst))
 	return folderDict
 
 #Generate a mapping from filename(fullPath or relativePath depending on the flag passed) to (fileHash, fileLastModifiedTime) for each entry in the index file
@@ -100,12 +228,12 @@ def getIndexFileHashMTimeMapping(keepFullPath=False):
 		return {}
 	idxDict = {}
 	fileContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")[:-1]
-	splitFileContent = map(lambda x: (x.split("\x00")[4], x.split("\x00")[2], x.split("\x00")[5]), fileContent)	
+	splitFileContent = list(map(lambda x: (x.split("\x00")[4], x.split("\x00")[2], x.split("\x00")[5]), fileContent))	
 	if keepFullPath:
 		fileToHashMapFunc = lambda x: idxDict.setdefault(x[0], (x[1], x[2]))
 	else:
 		fileToHashMapFunc = lambda x: idxDict.setdefault(os.path.split(x[0])[1], (x[1], x[2]))
-	map(fileToHashMapFunc, splitFileContent)	
+	list(map(fileToHashMapFunc, splitFileContent))	
 	return idxDict
 
 #Generate a mapping from filename(fullPath or relativePath depending on the flag passed) to (fileLastModifiedTime) for each entry in the index file
@@ -115,9 +243,9 @@ def getIndexFileMTimeMapping(keepFullPath=False):
 	idxDict = {}
 	fileContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")[:-1]
 	if keepFullPath:
-		map(lambda x: idxDict.setdefault(x.split("\x00")[4], x.split("\x00")[5]), fileContent)
+		list(map(lambda x: idxDict.setdefault(x.split("\x00")[4], x.split("\x00")[5]), fileContent))
 	else:
-		map(lambda x: idxDict.setdefault(os.path.split(x.split("\x00")[4])[1], x.split("\x00")[5]), fileContent)
+		list(map(lambda x: idxDict.setdefault(os.path.split(x.split("\x00")[4])[1], x.split("\x00")[5]), fileContent))
 	return idxDict
 
 #Generate a mapping from fileName(fullPath or relativePath depending on the flag passed) to (fileHash) for each entry in the index file
@@ -127,9 +255,9 @@ def getIndexFileHashMapping(keepFullPath=False):
 	idxDict = {}
 	fileContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")[:-1]
 	if keepFullPath:
-		map(lambda x: idxDict.setdefault(x.split("\x00")[4], x.split("\x00")[2]), fileContent)
+		list(map(lambda x: idxDict.setdefault(x.split("\x00")[4], x.split("\x00")[2]), fileContent))
 	else:
-		map(lambda x: idxDict.setdefault(os.path.split(x.split("\x00")[4])[1], x.split("\x00")[2]), fileContent)
+		list(map(lambda x: idxDict.setdefault(os.path.split(x.split("\x00")[4])[1], x.split("\x00")[2]), fileContent))
 	return idxDict	
 
 #Get the contents of the index file as list of strings where each item corresponds to a line in the index file
@@ -137,98 +265,275 @@ def getIndexFileList():
 	if not indexFileExists():
 		return []
 	fileContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")[:-1]
-	return map(lambda x: x.split("\x00")[4], fileContent)
+	return list(map(lambda x: x.split("\x00")[4], fileContent))
+
+#Get the time (in milliseconds) to keep retrying for a lock file held by another process from core.lockTimeout, falling back to the default lock timeout
+def getLockTimeout():
+	lockTimeout = readConfig().get("core.locktimeout", "")
+	return int(lockTimeout) if lockTimeout.isdigit() else defaultLockTimeout
+
+#Exclusively create the provided lock file and return its file descriptor. While another process holds the lock we retry with an exponential backoff (randomized
+#so that waiting processes do not wake up in lock step) until the lock timeout runs out, after which a LockTimeoutError is raised
+def createLockFile(lockFilePath):
+	checkAndCreateDir(os.path.split(lockFilePath)[0])
+	deadline, retryDelay = time.time() + getLockTimeout() / 1000.0, 0.001
+	while True:
+		try:
+			return os.open(lockFilePath, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+		except OSError as e:
+			if e.errno not in (errno.EEXIST, errno.EACCES):
+				raise
+			if time.time() >= deadline:
+				raise LockTimeoutError("Unable to create '" + lockFilePath + "': File exists. Another git process seems to be running in this repository. If no other git process is running, remove the file manually")
+			time.sleep(min(retryDelay * random.uniform(0.5, 1.5), max(deadline - time.time(), 0)))
+			retryDelay = min(retryDelay * 2, 0.1)
+
+#Replace the contents of the specified file using a lock file. The content is written to '<file>.lock' which is created exclusively, so a concurrent writer waits
+#for us instead of interleaving with us, and the lock file is then flushed to disk and renamed over the target
+#The optional check function is called while holding the lock. If it returns a (non empty) reason the file is left as it is and the reason is returned
+def writeFileWithLock(filePath, content, checkFunc=lambda: ""):
+	lockFilePath = filePath + ".lock"
+	lockFile = os.fdopen(createLockFile(lockFilePath), "wb")
+	try:
+		refusalReason = checkFunc()
+		if refusalReason != "":
+			lockFile.close()
+			deleteFileIfExists(lockFilePath)
+			return refusalReason
+		lockFile.write(encodeText(content))
+		lockFile.flush()
+		os.fsync(lockFile.fileno())
+		lockFile.close()
+		os.replace(lockFilePath, filePath)
+		return ""
+	except:
+		lockFile.close()
+		deleteFileIfExists(lockFilePath)
+		raise
+
+#Acquire the index lock ('index.lock') for an operation that reads, modifies and writes back the index. The lock is reentrant within this process so that
+#operations like merge can invoke add and commit. The ref caches are dropped when the lock is first taken since another process may have moved the refs
+def lockIndex():
+	global indexLockDepth, packedRefsLst
+	if indexLockDepth == 0:
+		os.close(createLockFile(os.path.join(currDir, ".git", "index.lock")))
+		refCache.clear()
+		packedRefsLst = None
+	indexLockDepth += 1
+
+#Release the index lock acquired using lockIndex. Once the outermost operation holding it is done, the final index is written again flushing it to disk
+#(the intermediate writes of the operation are not flushed) and the lock file is removed
+def unlockIndex():
+	global indexLockDepth, indexFlushPending
+	indexLockDepth -= 1
+	if indexLockDepth == 0:
+		try:
+			if indexFlushPending and indexFileExists():
+				indexPath = os.path.join(currDir, ".git", "index")
+				writeToFile(indexPath, readFromFile(indexPath, 'rb'), True)
+		finally:
+			indexFlushPending = False
+			deleteFileIfExists(os.path.join(currDir, ".git", "index.lock"))
+
+#Decorator for the git operations that modify the index, making them hold the index lock while they run
+def withIndexLock(gitOperation):
+	def lockedGitOperation(*args, **kwargs):
+		lockIndex()
+		try:
+			return gitOperation(*args, **kwargs)
+		finally:
+			unlockIndex()
+	return lockedGitOperation
+
+#Write the provided content to the index file. Operations like add rewrite the index once per file, so while the index lock is held only the final index is
+#flushed to disk when the lock is released. Without the lock the index is flushed before it replaces the previous one
+def writeIndexFile(content):
+	global indexFlushPending
+	writeToFile(os.path.join(currDir, ".git", "index"), content, indexLockDepth == 0)
+	indexFlushPending = indexLockDepth > 0
+
+#Write the compressed content of a git object to its file under the objects directory. Objects are content addressed and hence an existing object is never
+#rewritten. Object files are only flushed to disk if core.fsyncObjectFiles is set in the config
+def writeGitObject(objHash, compressedContent):
+	objFilePath = os.path.join(currDir, ".git", "objects", objHash[:2], objHash[2:])
+	if not os.path.isfile(objFilePath):
+		writeToFile(objFilePath, compressedContent, readConfig().get("core.fsyncobjectfiles", "false").lower() == "true")
+
+#Check if the provided string is a full (40 character) hexadecimal object hash
+def isObjectHash(objHash):
+	return len(objHash) == 40 and all(map(lambda x: x in string.hexdigits, objHash))
+
+#Normalize the ref name read from HEAD or provided by the user to always use '/' as the separator (eg. refs/heads/master)
+def normalizeRefName(refName):
+	return refName.strip().replace("\\", "/")
+
+#Get the full path of the loose ref file for the provided ref name
+def getRefFilePath(refName):
+	return os.path.join(currDir, ".git", *refName.split("/"))
+
+#Read the packed-refs file and return its entries as a list of (refName, commitHash) tuples sorted on the ref name
+#The peeled lines (^<hash>) that git writes after annotated tags and any malformed lines are skipped
+def readPackedRefs():
+	global packedRefsLst
+	if packedRefsLst is None:
+		packedRefsPath = os.path.join(currDir, ".git", packedRefsFileName)
+		fileContent = readFromFile(packedRefsPath).split("\n") if os.path.isfile(packedRefsPath) else []
+		entryLst = list(filter(lambda x: len(x) == 2 and isObjectHash(x[0]), map(lambda x: x.split(), filter(lambda x: not x.startswith(("#", "^")), fileContent))))
+		packedRefsLst = sorted(map(lambda x: (x[1], x[0]), entryLst))
+	return packedRefsLst
+
+#Look up the provided ref name in the packed-refs file using a binary search over its sorted entries
+def lookupPackedRef(refName):
+	packedLst = readPackedRefs()
+	pos = bisect.bisect_left(packedLst, (refName, ""))
+	if pos < len(packedLst) and packedLst[pos][0] == refName:
+		return packedLst[pos][1]
+	return ""
+
+#Resolve the provided ref name to its commit hash by looking in the ref cache, then the loose ref file and finally the packed-refs file
+#An empty string is returned (and cached) if the ref does not exist
+def resolveRef(refName):
+	refName = normalizeRefName(refName)
+	if refName not in refCache:
+		refFilePath = getRefFilePath(refName)
+		refCache[refName] = readFromFile(refFilePath).strip() if os.path.isfile(refFilePath) else lookupPackedRef(refName)
+	return refCache[refName]
+
+#Point the provided ref to the commit provided as input. The loose ref file is written under a lock and takes precedence over any packed entry
+def updateRef(refName, commitHash):
+	refName = normalizeRefName(refName)
+	writeFileWithLock(getRefFilePath(refName), commitHash)
+	refCache[refName] = commitHash
+
+#Get the raw content of the HEAD file, reading it only once per process
+def getHeadContent():
+	if "HEAD" not in refCache:
+		refCache["HEAD"] = readFromFile(os.path.join(currDir, ".git", "HEAD")).strip()
+	return refCache["HEAD"]
+
+#Replace the content of the HEAD file under a lock and keep the cached copy in sync
+def updateHeadContent(content):
+	writeFileWithLock(os.path.join(currDir, ".git", "HEAD"), content)
+	refCache["HEAD"] = content
+
+#Get the ref that HEAD points to, or None if HEAD is detached and holds a commit hash directly
+def getHeadRef():
+	headContent = getHeadContent()
+	if "ref:" not in headContent:
+		return None
+	return normalizeRefName(headContent.split()[1])
+
+#List the names of all the refs under the provided prefix by merging the packed-refs entries with the loose refs found by walking the refs directory
+#Only directory listings are needed for the loose refs, the ref files themselves are never opened
+def listRefs(prefix="refs/heads/"):
+	packedLst = readPackedRefs()
+	startPos = bisect.bisect_left(packedLst, (prefix, ""))
+	packedNames = list(map(lambda x: x[0], itertools.takewhile(lambda x: x[0].startswith(prefix), itertools.islice(packedLst, startPos, None))))
+	gitDir = os.path.join(currDir, ".git")
+	toRefName = lambda x: "/".join(os.path.relpath(x, gitDir).split(os.sep))
+	looseNames = reduce(lambda acc, x: acc + list(map(lambda y: toRefName(os.path.join(x[0], y)), filter(lambda y: not y.endswith(".lock"), x[2]))), os.walk(getRefFilePath(prefix.rstrip("/"))), [])
+	return sorted(set(packedNames + looseNames))
+
+#Delete the loose ref file of a ref that has been packed. The ref is locked while doing so and is left alone if another process has moved it in the meanwhile
+def pruneLooseRef(refName, packedCommitHash):
+	refFilePath = getRefFilePath(refName)
+	os.close(createLockFile(refFilePath + ".lock"))
+	try:
+		if os.path.isfile(refFilePath) and readFromFile(refFilePath).strip() == packedCommitHash:
+			os.remove(refFilePath)
+	finally:
+		deleteFileIfExists(refFilePath + ".lock")
 
 #Get the latest commit that was made against the current branch, i.e HEAD
 def getLatestCommitForCurrentBranch():
-	parentCommit = ""
-	headContent = readFromFile(os.path.join(currDir, ".git", "HEAD"))
-	if "ref:" not in headContent :
-		return headContent
-	filePath = os.path.join(currDir, ".git", headContent.split()[1])
-	if os.path.isfile(filePath):
-		parentCommit = readFromFile(filePath)
-	return parentCommit
+	headRef = getHeadRef()
+	if headRef is None:
+		return getHeadContent()
+	return resolveRef(headRef)
 
 #Update the latest commit for the current branch to the commit provided as input
 def updateCurrentBranchLatestCommit(commitHash):
-	headFilePath = os.path.join(currDir, ".git", "HEAD")
-	headContent = readFromFile(headFilePath)
-	if "ref:" not in headContent:
-		writeToFile(headFilePath, commitHash, "w")
-		return
-	currBranchFilePath = os.path.join(currDir, ".git", headContent.split()[1])
-	writeToFile(currBranchFilePath, commitHash, "w")	
+	headRef = getHeadRef()
+	if headRef is None:
+		updateHeadContent(commitHash)
+	else:
+		updateRef(headRef, commitHash)
 
 #Create all of the folders that are defined in folderLst as part of Git Init command
 def createGitFolders(rootFolder):
-	fullFolderPathLst = map(lambda x: os.path.join(currDir, rootFolder, x), folderLst)
-	map(os.makedirs, fullFolderPathLst)
+	fullFolderPathLst = list(map(lambda x: os.path.join(currDir, rootFolder, x), folderLst))
+	list(map(os.makedirs, fullFolderPathLst))
 
 #Create all of the files that are defined in fileLstWithContent as part of Git Init command
 def createGitFiles(rootFolder):
-	fullFilePathLst = map(lambda x: [os.path.join(currDir, rootFolder, x[0]), x[1]], fileLstWithContent)	
-	map(lambda x: writeToFile(x[0], x[1], 'w'), fullFilePathLst)
+	fullFilePathLst = list(map(lambda x: [os.path.join(currDir, rootFolder, x[0]), x[1]], fileLstWithContent))	
+	list(map(lambda x: writeToFile(x[0], x[1]), fullFilePathLst))
 
 #Get the list of all the files from the working copy that contain user changes and exist within the provided directory
 def getFilesToGitAdd(fullFileOrDirectory):
 	filesToGitAdd = []
 	if os.path.isdir(fullFileOrDirectory):
-		filesToGitAdd = reduce(lambda y, acc: y + acc, map(lambda x: map(lambda z: os.path.join(x[0], z), x[2]) if ".git" not in x[0] else [], os.walk(fullFileOrDirectory)))
+		filesToGitAdd = reduce(lambda y, acc: y + acc, list(map(lambda x: list(map(lambda z: os.path.join(x[0], z), x[2])) if ".git" not in x[0] else [], os.walk(fullFileOrDirectory))))
 	else:
 		filesToGitAdd = [fullFileOrDirectory]
 	return filesToGitAdd
 
+#Generate the content of the blob object (as bytes) for the provided file content
+def makeBlobObjectContent(fileContent):
+	return b'blob\x00' + str(len(fileContent)).encode() + b'\x00' + fileContent
+
+#Get the last modified time of the file as stored in the index. It is formatted with the same precision as the earlier Python 2 implementation used, so that the
+#index files it wrote stay valid
+def getFileMTime(filePath):
+	return "%.12g" % os.path.getmtime(filePath)
+
 #Generate the compressed content and hash of the file specified by its relative path
 def makeGitCompressedContentAndHashWithRelPath(filePath):
-	fileContent = readFromFile(filePath)	
-	finalContent = 'blob\x00' +  str(len(fileContent)) + '\x00' + fileContent
-	relativePath, compressedContent, genHash = (os.path.relpath(filePath, currDir), zlib.compress(finalContent), sha1(finalContent).hexdigest())
+	fileContent = readFromFile(filePath, 'rb')
+	finalContent = makeBlobObjectContent(fileContent)
+	relativePath, compressedContent, genHash = (os.path.relpath(filePath, currDir), compressGitObject(finalContent, fileContent), sha1(finalContent).hexdigest())
 	return (relativePath, compressedContent, genHash)
 
 #Create the git blob object and corresponding directory(if required) using the files content and its hash
 def writeGitBlobObjects(contentWithFilePathAndHash):
-	objFilePath = contentWithFilePathAndHash[2][:2]
-	objFileName = contentWithFilePathAndHash[2][2:]
-	objFileContent = contentWithFilePathAndHash[1]
-	blobObjectDir = os.path.join(currDir, ".git", "objects", objFilePath)
-	checkAndCreateDir(blobObjectDir)
-	writeToFile(os.path.join(blobObjectDir, objFileName), objFileContent, 'w')
+	writeGitObject(contentWithFilePathAndHash[2], contentWithFilePathAndHash[1])
 
 #Update the index file with modifications for already added files reflecting the user changes
 def updateGitIndexFileWithModifications(contentWithFilePathAndHash, permMode=100644, stage=0):
 	prevIndexContent = []
 	fileHash, fileRelativePath = contentWithFilePathAndHash[2], contentWithFilePathAndHash[0]
-	fileLastModifiedTime = str(os.path.getmtime(os.path.join(currDir, fileRelativePath)))	
+	fullFilePath = os.path.join(currDir, fileRelativePath)
+	fileLastModifiedTime = getFileMTime(fullFilePath) if os.path.isfile(fullFilePath) else "0"
 	if indexFileExists():
 		prevIndexContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")		
 	contentToWrite = str(permMode) + "\x00blob\x00" + fileHash + "\x00" + str(stage) + "\x00" + fileRelativePath + "\x00" + fileLastModifiedTime
 	if contentToWrite not in prevIndexContent:
-		newIndexContent = map(lambda x: contentToWrite if fileRelativePath in x else x, prevIndexContent)		
+		newIndexContent = list(map(lambda x: contentToWrite if fileRelativePath in x else x, prevIndexContent))		
 		if newIndexContent == prevIndexContent:
 			contentToWrite = "\n".join(prevIndexContent[:-1] + [contentToWrite + "\x00\n"])
 		elif indexFileExists():
 			contentToWrite = "\n".join(newIndexContent)		
-		writeToFile(os.path.join(currDir, ".git", "index"), contentToWrite, "w")	
+		writeIndexFile(contentToWrite)
 
 #Update the index file with deletions for already added files reflecting the files that the user deleted
-def updateGitIndexFileWithDeletions(gitAddDirOrFile):	
+#Files outside of the sparse checkout are not present in the working copy by design and hence their entries are kept unless keepSparseEntries is unset
+def updateGitIndexFileWithDeletions(gitAddDirOrFile, keepSparseEntries=True):	
 	prevIndexContent = []
 	if indexFileExists():
 		prevIndexContent = readFromFile(os.path.join(currDir, ".git", "index")).split("\n")
 	else:
 		return False	
-	checkIfIsUnder = lambda i: os.path.join(currDir, i).startswith(gitAddDirOrFile)
-	updatedIndexContent = filter(lambda x: x == "" or not checkIfIsUnder(x.split("\x00")[4]) or (checkIfIsUnder(x.split("\x00")[4]) and os.path.isfile(os.path.join(currDir, x.split("\x00")[4]))), prevIndexContent)
+	checkIfIsUnder = lambda i: os.path.join(currDir, i).startswith(gitAddDirOrFile) and (not keepSparseEntries or isPathInSparseCheckout(i))
+	updatedIndexContent = list(filter(lambda x: x == "" or not checkIfIsUnder(x.split("\x00")[4]) or (checkIfIsUnder(x.split("\x00")[4]) and os.path.isfile(os.path.join(currDir, x.split("\x00")[4]))), prevIndexContent))
 	contentToWrite = "\n".join(updatedIndexContent)
-	writeToFile(os.path.join(currDir, ".git", "index"), contentToWrite, "w")
+	writeIndexFile(contentToWrite)
 	return True
 
 #Generate the content of the Git tree object represented by the treeObj variable as string	
 def getGitTreeObjectContent(treeObj):
 	idxDict = getIndexFileHashMTimeMapping()		
-	content = map(lambda x: "040000\x00tree\x00" + x.CurrDirHash + "\x00" + x.CurrDir, treeObj.DirTreeLst)	
-	content = content + map(lambda x: "100644\x00blob\x00" + idxDict[x][0] + "\x00" + x, treeObj.FileHashMap)
+	content = list(map(lambda x: "040000\x00tree\x00" + x.CurrDirHash + "\x00" + x.CurrDir, treeObj.DirTreeLst))	
+	content = content + list(map(lambda x: "100644\x00blob\x00" + idxDict[x][0] + "\x00" + x, treeObj.FileHashMap))
 	contentToWrite = "\n".join(content)	
 	return contentToWrite
 
@@ -238,16 +543,14 @@ def recursiveTraverseDirTree(fileLst, dirObj):
 	dirContents = getDirectoryContents(fileLst)
 	fileLst,  folderLst = separateFilesAndFolder(dirContents)
 	fileLstMap = {}
-	map(lambda x: fileLstMap.setdefault(x, ""), fileLst)
+	list(map(lambda x: fileLstMap.setdefault(x, ""), fileLst))
 	dirObj.FileHashMap = fileLstMap
 	folderDict = groupSubDirectories(folderLst)	
-	dirObj.DirTreeLst = map(lambda x: recursiveTraverseDirTree(folderDict[x], DirTree(x)), folderDict)
+	dirObj.DirTreeLst = list(map(lambda x: recursiveTraverseDirTree(folderDict[x], DirTree(x)), folderDict))
 	contentToWrite = getGitTreeObjectContent(dirObj)
 	if contentToWrite != "" and len(contentToWrite) > 2:
-		dirObj.CurrDirHash = sha1(contentToWrite).hexdigest()		
-		objPath = os.path.join(currDir, ".git", "objects", dirObj.CurrDirHash[:2])
-		checkAndCreateDir(objPath)
-		writeToFile(os.path.join(objPath, dirObj.CurrDirHash[2:]), zlib.compress(contentToWrite), "wb")
+		dirObj.CurrDirHash = sha1(encodeText(contentToWrite)).hexdigest()		
+		writeGitObject(dirObj.CurrDirHash, compressGitObject(encodeText(contentToWrite)))
 	return dirObj
 
 #Generate the commit object and its contents using the root directory tree object and the user provided commit message
@@ -260,147 +563,169 @@ def writeCommitObject(rootDirObj, commitMsg, otherParent=None):
 	if otherParent is not None:
 		contentToWrite = contentToWrite + "parent\x00" + otherParent + "\n"
 	contentToWrite = contentToWrite + "'" + commitMsg + "'"
-	commitObjectFile = sha1(contentToWrite).hexdigest()
+	commitObjectFile = sha1(encodeText(contentToWrite)).hexdigest()
+	writeGitObject(commitObjectFile, compressGitObject(encodeText(contentToWrite)))
 	updateCurrentBranchLatestCommit(commitObjectFile)
-	commitObjDir = os.path.join(currDir, ".git", "objects", commitObjectFile[:2])
-	checkAndCreateDir(commitObjDir)
-	writeToFile(os.path.join(commitObjDir, commitObjectFile[2:]), zlib.compress(contentToWrite), "wb")
 
 #Perform the initial processing for making the git commit
 def makeGitCommit(commitMsg, otherParent=None):	
 	rootDirName = os.path.split(currDir)[1]
 	rootDirObj = DirTree(rootDirName)
-	fileLst = map(lambda x: os.path.join(rootDirName, x), getIndexFileList())
+	fileLst = list(map(lambda x: os.path.join(rootDirName, x), getIndexFileList()))
 	rootDirObj = recursiveTraverseDirTree(fileLst, rootDirObj)
 	writeCommitObject(rootDirObj, commitMsg, otherParent)
 
 #Generate the hash of the file using sha1 for the file path provided
 def generateFileHash(filePath):	
-	fileContent = readFromFile(filePath)		
-	newContent = 'blob\x00' +  str(len(fileContent)) + '\x00' + fileContent
-	# print (filePath, fileContent, newContent)	
+	newContent = makeBlobObjectContent(readFromFile(filePath, 'rb'))
 	return sha1(newContent).hexdigest()
 
 #Recursively parse the contents of the tree objects and generate the corresponding tree objects
 def parseFileAndMakeDirTreeObject(fileHash, objName=""):
 	objName = objName if objName != "" else os.path.split(currDir)[1]
 	filePath = os.path.join(currDir, ".git", "objects", fileHash[:2], fileHash[2:])
-	fileContentLst = readFromFileAndDecompress(filePath).split("\n")	
-	fileContentSpaceSep = map(lambda x: x.split("\x00"), fileContentLst)
+	fileContentLst = list(filter(lambda x: x != "", decodeText(readFromFileAndDecompress(filePath)).split("\n")))
+	fileContentSpaceSep = list(map(lambda x: x.split("\x00"), fileContentLst))
 	dirTreeObj = DirTree(objName)
+	dirTreeObj.CurrDirHash = fileHash
 	mapFunc = (lambda x: dirTreeObj.DirTreeLst.append(parseFileAndMakeDirTreeObject(x[2], x[3])) if (x[1] == "tree") else dirTreeObj.FileHashMap.setdefault(x[3], x[2]))
-	map(mapFunc, fileContentSpaceSep)	
+	list(map(mapFunc, fileContentSpaceSep))	
 	return dirTreeObj
 	
+#Parse the contents of the commit object and return the hash of its root tree object
+def getRootTreeHashFromCommit(commitHash):
+	commitObjPath = os.path.join(currDir, ".git", "objects", commitHash[:2], commitHash[2:])
+	uncompressedFileContent = decodeText(readFromFileAndDecompress(commitObjPath))
+	return (uncompressedFileContent.split("\n")[0]).split("\x00")[1]
+
 #Parse the contents of the commit object and generate the root tree object from it
 def makeDirTreeObjectFromCommit(commitHash):	
-	commitObjPath = os.path.join(currDir, ".git", "objects", commitHash[:2], commitHash[2:])
-	uncompressedFileContent = readFromFileAndDecompress(commitObjPath)
-	rootTreeHash = (uncompressedFileContent.split("\n")[0]).split("\x00")[1]
-	rootTreeObj = parseFileAndMakeDirTreeObject(rootTreeHash)
+	rootTreeObj = parseFileAndMakeDirTreeObject(getRootTreeHashFromCommit(commitHash))
 	return rootTreeObj
 
+#Read the entries of the tree object with the provided hash (without descending into its sub-trees) as a list of (name, type, hash) tuples sorted on the name
+#An empty hash represents a tree that does not exist on one side of a comparison and has no entries
+def readTreeEntries(treeHash):
+	if not treeHash:
+		return []
+	filePath = os.path.join(currDir, ".git", "objects", treeHash[:2], treeHash[2:])
+	entryLst = list(map(lambda x: x.split("\x00"), filter(lambda x: x != "", decodeText(readFromFileAndDecompress(filePath)).split("\n"))))
+	return sorted(map(lambda x: (x[3], x[1], x[2]), entryLst))
+
 #Recursively generate the mapping of files and their corresponding hash for a given tree object
 def recursivelyGenerateFileHashMap(dirTreeObj, rootPath="", fullFilePath=False):
 	tmpDict = {}
 	if fullFilePath:
 		updatedRootPath = os.path.join(rootPath, dirTreeObj.CurrDir)
-		map(lambda x: tmpDict.setdefault(os.path.join(updatedRootPath,x), dirTreeObj.FileHashMap[x]) ,dirTreeObj.FileHashMap)
-		map(lambda x: tmpDict.update(recursivelyGenerateFileHashMap(x, updatedRootPath, fullFilePath)), dirTreeObj.DirTreeLst)
+		list(map(lambda x: tmpDict.setdefault(os.path.join(updatedRootPath,x), dirTreeObj.FileHashMap[x]) ,dirTreeObj.FileHashMap))
+		list(map(lambda x: tmpDict.update(recursivelyGenerateFileHashMap(x, updatedRootPath, fullFilePath)), dirTreeObj.DirTreeLst))
 		return tmpDict
 	else:
 		tmpDict.update(dirTreeObj.FileHashMap)
-		map(lambda x: tmpDict.update(recursivelyGenerateFileHashMap(x)), dirTreeObj.DirTreeLst)
+		list(map(lambda x: tmpDict.update(recursivelyGenerateFileHashMap(x)), dirTreeObj.DirTreeLst))
 		return tmpDict	
 
 
 #Returns the list of files that show differences in the index compared to their current state in local
 def diffIndexAndLocal():
 	fileAndMTimeDict = getIndexFileHashMTimeMapping(True)
-	filterOutUnmodified = lambda x: not os.path.isfile(os.path.join(currDir, x)) or (fileAndMTimeDict[x][1] != str(os.path.getmtime(os.path.join(currDir, x))) or fileAndMTimeDict[x][0] != generateFileHash(os.path.join(currDir, x)))
-	modifiedOrDeletedFilesLst = filter(filterOutUnmodified, fileAndMTimeDict)
-	taggedLst = map (lambda x: x + ": Deleted" if not os.path.isfile(os.path.join(currDir, x)) else x + ": Modified", modifiedOrDeletedFilesLst)
+	filterOutUnmodified = lambda x: not os.path.isfile(os.path.join(currDir, x)) or (fileAndMTimeDict[x][1] != getFileMTime(os.path.join(currDir, x)) or fileAndMTimeDict[x][0] != generateFileHash(os.path.join(currDir, x)))
+	modifiedOrDeletedFilesLst = list(filter(filterOutUnmodified, filter(isPathInSparseCheckout, fileAndMTimeDict)))
+	taggedLst = list(map(lambda x: x + ": Deleted" if not os.path.isfile(os.path.join(currDir, x)) else x + ": Modified", modifiedOrDeletedFilesLst))
 	return taggedLst	
 
 #Returns the list of files that show differences in the latest commit compared to their state in the index file
 def diffLatestCommitAndIndex():	
 	idxFileDict, rootDirName = {}, os.path.split(currDir)[1]
 	relPathIdxFileDict = getIndexFileHashMapping(True)
-	map(lambda x: idxFileDict.setdefault(os.path.join(rootDirName, x), relPathIdxFileDict[x]), relPathIdxFileDict)
+	list(map(lambda x: idxFileDict.setdefault(os.path.join(rootDirName, x), relPathIdxFileDict[x]), relPathIdxFileDict))
 	latestCommit = getLatestCommitForCurrentBranch()	
 	if latestCommit == "":		
 		return []
 	rootTreeObj = makeDirTreeObjectFromCommit(latestCommit)
 	cmtFileDict = recursivelyGenerateFileHashMap(rootTreeObj, "", True)	
 	filterFunc = lambda x: ((x in cmtFileDict and cmtFileDict[x] != idxFileDict[x]) or (x not in cmtFileDict))
-	modifiedFilesLst = filter(filterFunc, idxFileDict)
-	modifiedFilesLst = modifiedFilesLst + filter(lambda x: x not in idxFileDict, cmtFileDict)
+	modifiedFilesLst = list(filter(filterFunc, idxFileDict))
+	modifiedFilesLst = modifiedFilesLst + list(filter(lambda x: x not in idxFileDict, cmtFileDict))
 	checkFileAdded = lambda x: x in idxFileDict and x not in cmtFileDict
 	checkFileDeleted = lambda x: x not in idxFileDict and x in cmtFileDict
 	mapFunc = lambda x: x + ": Added" if checkFileAdded(x) else (x + ": Deleted" if checkFileDeleted(x) else x + ": Modified")
-	taggedLst = map(mapFunc, modifiedFilesLst)
+	taggedLst = list(map(mapFunc, modifiedFilesLst))
 	return taggedLst	
 
 #Returns the list of files that show differences in the latest commit as compared to thier current state in local
 def diffLatestCommitAndLocal():
 	idxFileDict = getIndexFileHashMapping(True)
-	trackedFileLst = map(lambda x: os.path.join(currDir, x), idxFileDict)
+	trackedFileLst = list(map(lambda x: os.path.join(currDir, x), filter(isPathInSparseCheckout, idxFileDict)))
 	latestCommit = getLatestCommitForCurrentBranch()		
 	if latestCommit == "":		
 		return []
 	rootTreeObj = makeDirTreeObjectFromCommit(latestCommit)
 	cmtFileDict = recursivelyGenerateFileHashMap(rootTreeObj, os.path.split(currDir)[0], True)
-	addedFileLst = map(lambda y: y + ": Added", filter(lambda x: x not in cmtFileDict, trackedFileLst))
-	deletedFileLst = map(lambda y: y + ": Deleted", filter(lambda x: not os.path.isfile(x), cmtFileDict))
-	deletedFileLst = deletedFileLst + map(lambda y: y + ": Deleted", filter(lambda x: not os.path.isfile(x) and (x + ": Deleted") not in deletedFileLst, trackedFileLst))		
-	modifiedFilesLst = map(lambda y: y + ": Modified", filter(lambda x: x in cmtFileDict and (x + ": Deleted") not in deletedFileLst and generateFileHash(x) != cmtFileDict[x], trackedFileLst))	
+	cmtFileDict = dict(filter(lambda x: isPathInSparseCheckout(x[0]), cmtFileDict.items()))
+	addedFileLst = list(map(lambda y: y + ": Added", filter(lambda x: x not in cmtFileDict, trackedFileLst)))
+	deletedFileLst = list(map(lambda y: y + ": Deleted", filter(lambda x: not os.path.isfile(x), cmtFileDict)))
+	deletedFileLst = deletedFileLst + list(map(lambda y: y + ": Deleted", filter(lambda x: not os.path.isfile(x) and (x + ": Deleted") not in deletedFileLst, trackedFileLst)))		
+	modifiedFilesLst = list(map(lambda y: y + ": Modified", filter(lambda x: x in cmtFileDict and (x + ": Deleted") not in deletedFileLst and generateFileHash(x) != cmtFileDict[x], trackedFileLst)))	
 	return addedFileLst + modifiedFilesLst + deletedFileLst
 
-#Return the string content without extra '\x00' characters
+#Return the original file content (as bytes) of the blob object without its header
 def extractOriginalContent(objContent):	
-	return objContent.split('\x00')[2]
+	return objContent.split(b'\x00', 2)[2]
+
+#Write the content of a working copy file in place. Unlike writeToFile no temporary file is created next to it, which could be left behind in the project tree
+#and picked up by the next add, and an existing file keeps its permissions
+def writeWorkingCopyFile(file, content):
+	checkAndCreateDir(os.path.split(file)[0])
+	with open(file, "wb") as f:
+		f.write(content)
 
 #Parse and write the contents of the blob object to the specified file path
 def writeBlobObjToFile(filePath, blobHash):
 	objPath = os.path.join(currDir, ".git", "objects", blobHash[:2], blobHash[2:])
 	objContent = readFromFileAndDecompress(objPath)
 	origContent = extractOriginalContent(objContent)
-	writeToFile(filePath, origContent, 'wb')
+	writeWorkingCopyFile(filePath, origContent)
 
 #Recursively traverse through the working copy applying the changes represented by the commit object
+#Sub-trees and files outside of the sparse checkout are skipped, so their blobs are never decompressed or written
 def recursivelyApplyCommitToWorkingCopy(treeObj, rootPath):
 	if not os.path.isdir(rootPath):
 		os.makedirs(rootPath)
 	updatedRootPath = os.path.join(rootPath, treeObj.CurrDir)
-	map(lambda x: writeBlobObjToFile(os.path.join(updatedRootPath, x), treeObj.FileHashMap[x]), treeObj.FileHashMap)
-	map(lambda x: recursivelyApplyCommitToWorkingCopy(x, updatedRootPath), treeObj.DirTreeLst)
+	list(map(lambda x: writeBlobObjToFile(os.path.join(updatedRootPath, x), treeObj.FileHashMap[x]), filter(lambda x: isPathInSparseCheckout(os.path.join(updatedRootPath, x)), treeObj.FileHashMap)))
+	list(map(lambda x: recursivelyApplyCommitToWorkingCopy(x, updatedRootPath), filter(lambda x: isDirInSparseCheckout(os.path.join(updatedRootPath, x.CurrDir)), treeObj.DirTreeLst)))
 
 #Recursively traverse through the working copy deleting the changes represented by the commit object
+#Sub-trees outside of the sparse checkout were never written to the working copy and hence are skipped
 def recursivelyDeleteCommitFromWorkingCopy(treeObj, rootPath):
 	updatedRootPath = os.path.join(rootPath, treeObj.CurrDir)
-	map(lambda x: deleteFileIfExists(os.path.join(updatedRootPath, x)), treeObj.FileHashMap)
-	map(lambda x: recursivelyDeleteCommitFromWorkingCopy(x, updatedRootPath), treeObj.DirTreeLst)
-	_, folders, files = os.walk(updatedRootPath).next()
+	if not os.path.isdir(updatedRootPath):
+		return
+	list(map(lambda x: deleteFileIfExists(os.path.join(updatedRootPath, x)), filter(lambda x: isPathInSparseCheckout(os.path.join(updatedRootPath, x)), treeObj.FileHashMap)))
+	list(map(lambda x: recursivelyDeleteCommitFromWorkingCopy(x, updatedRootPath), filter(lambda x: isDirInSparseCheckout(os.path.join(updatedRootPath, x.CurrDir)), treeObj.DirTreeLst)))
+	_, folders, files = next(os.walk(updatedRootPath))
 	if not files and not folders:
 		os.rmdir(updatedRootPath)
 
 #Helper function for reflecting the changes represented by the commit object onto the index file
+#Files outside of the sparse checkout do not exist in the working copy and get a modified time of 0
 def applyCommitToIndexHelper(fileName, fileHash, permMode=100644, stage=0):
 	fullFilePath = os.path.join(currDir, fileName)
-	modifiedTime = str(os.path.getmtime(fullFilePath))	
+	modifiedTime = getFileMTime(fullFilePath) if os.path.isfile(fullFilePath) else "0"
 	return str(permMode) + "\x00blob\x00" + fileHash + "\x00" + str(stage) + "\x00" + fileName + "\x00" + modifiedTime
 
 #Generate the contents of the index file using the commit object provided as input
 def recursivelyPrepareIndexFromCommit(treeObj, rootPath):
 	resultLst = []
 	updatedRootPath = os.path.join(rootPath, "" if treeObj.CurrDir == os.path.split(currDir)[1] else treeObj.CurrDir)
-	resultLst = map(lambda x: applyCommitToIndexHelper(os.path.join(updatedRootPath, x), treeObj.FileHashMap[x]), treeObj.FileHashMap)	
+	resultLst = list(map(lambda x: applyCommitToIndexHelper(os.path.join(updatedRootPath, x), treeObj.FileHashMap[x]), treeObj.FileHashMap))	
 	resultLst.extend(reduce(lambda acc, x: acc + recursivelyPrepareIndexFromCommit(x, updatedRootPath), treeObj.DirTreeLst, []))
 	return resultLst
 
 #Update the contents of the HEAD ref to point to the branch that is provided in the input
 def updateHeadWithNewCurrentBranch(branchName):
-	writeToFile(os.path.join(currDir, ".git", "HEAD"), "ref: refs\\heads\\" + branchName, 'w')
+	updateHeadContent("ref: refs/heads/" + branchName)
 
 #Delete the changes represented by the old commit from the working copy and apply the changes represented by the new commit
 def removeOldCommitAndApplyNewCommit(newCommit, oldCommit):
@@ -408,9 +733,9 @@ def removeOldCommitAndApplyNewCommit(newCommit, oldCommit):
 	recursivelyDeleteCommitFromWorkingCopy(oldRootTreeObj, os.path.split(currDir)[0])
 	recursivelyApplyCommitToWorkingCopy(newRootTreeObj, os.path.split(currDir)[0])
 	cmtFilesDict = recursivelyGenerateFileHashMap(newRootTreeObj, "", True)
-	fileLst = getDirectoryContents(map(lambda x: x, cmtFilesDict))
+	fileLst = getDirectoryContents(list(map(lambda x: x, cmtFilesDict)))
 	newIndexContent = "\n".join(recursivelyPrepareIndexFromCommit(newRootTreeObj, "")) + "\x00\n"
-	writeToFile(os.path.join(currDir, ".git", "index"), newIndexContent, "w")
+	writeIndexFile(newIndexContent)
 
 #Extract and return the parent/parents from the commit object provided as input
 def extractParentCommit(commitContent):
@@ -429,7 +754,7 @@ def getCommitAncestory(commitHash, alreadyVisited=[]):
 		return None	
 	alreadyVisited.append(commitHash)
 	commitObjPath = os.path.join(currDir, ".git", "objects", commitHash[:2], commitHash[2:])
-	rawCommitContent = readFromFileAndDecompress(commitObjPath)	
+	rawCommitContent = decodeText(readFromFileAndDecompress(commitObjPath))	
 	# print "Commit Hash: ", commitHash
 	# print "Commit Content: ", rawCommitContent
 	parentCommit = extractParentCommit(rawCommitContent)			
@@ -442,43 +767,247 @@ def getCommitAncestory(commitHash, alreadyVisited=[]):
 def flattenCommitAncestory(commitAncestory):
 	return sum( ([x] if not isinstance(x, tuple) else flattenCommitAncestory(x) for x in commitAncestory), [] )
 
-#Generate the list of all conflicts and deletions represented by merging working copies obtained by the targetBranchIndex and currentBranchIndex
-def generateResultIndexForMerge(targetBranchIdx, currBranchIdx, commonAncestorIdx):		
-	resultDict, conflictsLst, deletedFilesLst = {}, [], []
-	for key in commonAncestorIdx.keys():
-		if key in targetBranchIdx and key not in currBranchIdx:
-			if targetBranchIdx[key] != commonAncestorIdx[key]:
-				conflictsLst.append(key)
-			else:
-				deletedFilesLst.append(key)
-		elif key in currBranchIdx and key not in targetBranchIdx:
-			if currBranchIdx[key] != commonAncestorIdx[key]:
-				conflictsLst.append(key)
-			else:
-				deletedFilesLst.append(key)		
-		elif key in targetBranchIdx and key in currBranchIdx:
-			if targetBranchIdx[key] == currBranchIdx[key]:
-				if targetBranchIdx[key] != commonAncestorIdx[key]:
-					resultDict[key] = currBranchIdx[key]
-			elif commonAncestorIdx[key] == targetBranchIdx[key]:
-				resultDict[key] = currBranchIdx[key]
-			elif commonAncestorIdx[key] == currBranchIdx[key]:
-				resultDict[key] = targetBranchIdx[key]
-			else:
-				conflictsLst.append(key)
+#Apply the merge policy to a single file given its hash on the target branch, the current branch and the common ancestor (an empty hash meaning the file is absent)
+#and record the outcome in the ResultIndex, ConflictsList or DeletedList of the merge result
+def applyMergePolicyToFile(filePath, fileHashes, mergeResult):
+	targetHash, currHash, ancestorHash = fileHashes
+	if targetHash == currHash:
+		if targetHash == "":
+			mergeResult["DeletedList"].append(filePath)
+		elif targetHash != ancestorHash:
+			mergeResult["ResultIndex"][filePath] = currHash
+	elif ancestorHash == "":
+		if currHash == "":
+			mergeResult["ResultIndex"][filePath] = targetHash
+		elif targetHash == "":
+			mergeResult["ResultIndex"][filePath] = currHash
 		else:
-			deletedFilesLst.append(key)		
-
-	for key in [x for x in currBranchIdx.keys() if x not in commonAncestorIdx]:
-		if key not in targetBranchIdx or (targetBranchIdx[key] == currBranchIdx[key]):
-			resultDict[key] = currBranchIdx[key]
+			mergeResult["ConflictsList"].append(filePath)
+	elif targetHash == ancestorHash:
+		if currHash == "":
+			mergeResult["DeletedList"].append(filePath)
+		else:
+			mergeResult["ResultIndex"][filePath] = currHash
+	elif currHash == ancestorHash:
+		if targetHash == "":
+			mergeResult["DeletedList"].append(filePath)
 		else:
-			conflictsLst.append(key)
+			mergeResult["ResultIndex"][filePath] = targetHash
+	else:
+		mergeResult["ConflictsList"].append(filePath)
+
+#Walk the entries of the provided tree objects side by side as a sorted merge-join. For every entry name and type, yields its hash on each side ("" where absent)
+def joinTreeEntries(treeHashes):
+	taggedEntryLst = list(map(lambda i: list(map(lambda x: ((x[0], x[1]), i, x[2]), readTreeEntries(treeHashes[i]))), range(len(treeHashes))))
+	for (entryName, entryType), entryGroup in itertools.groupby(heapq.merge(*taggedEntryLst), lambda x: x[0]):
+		entryHashes = [""] * len(treeHashes)
+		for _, side, entryHash in entryGroup:
+			entryHashes[side] = entryHash
+		yield (entryName, entryType, entryHashes)
+
+#Recursively compare the tree objects of the target branch, the current branch and the common ancestor as a sorted merge-join over their entries
+#A sub-tree that the target branch did not change, i.e it is identical to the common ancestor or to the current branch, has nothing to give to the working copy and is
+#skipped without being read. This way only the changed region of the trees is visited and the memory used is bounded by the depth of the tree
+def recursivelyCompareTreesForMerge(treeHashes, rootPath, mergeResult):
+	targetHash, currHash, ancestorHash = treeHashes
+	if targetHash == ancestorHash or targetHash == currHash:
+		return
+	for entryName, entryType, entryHashes in joinTreeEntries(treeHashes):
+		if entryType == "tree":
+			recursivelyCompareTreesForMerge(entryHashes, os.path.join(rootPath, entryName), mergeResult)
+		else:
+			applyMergePolicyToFile(os.path.join(rootPath, entryName), entryHashes, mergeResult)
 
-	for key in [x for x in targetBranchIdx.keys() if x not in commonAncestorIdx and x not in currBranchIdx]:
-		resultLst[key] = targetBranchIdx[key]
-		
-	return ({"ResultIndex": resultDict, "ConflictsList": conflictsLst, "DeletedList" : deletedFilesLst}, conflictsLst != [])
+#Generate the list of all conflicts and deletions represented by merging the working copies of the target branch commit and the current branch commit using their common ancestor commit
+def generateResultIndexForMerge(targetBranchCommit, currBranchCommit, commonAncestorCommit):		
+	mergeResult = {"ResultIndex": {}, "ConflictsList": [], "DeletedList": []}
+	rootTreeHashes = list(map(getRootTreeHashFromCommit, [targetBranchCommit, currBranchCommit, commonAncestorCommit]))
+	recursivelyCompareTreesForMerge(rootTreeHashes, currDir, mergeResult)
+	return (mergeResult, mergeResult["ConflictsList"] != [])
+
+#Parse the contents of the commit object and return its root tree hash, the list of its parent commits and the commit message (without the enclosing quotes)
+def parseCommitObject(commitHash):
+	commitObjPath = os.path.join(currDir, ".git", "objects", commitHash[:2], commitHash[2:])
+	commitContentLst = decodeText(readFromFileAndDecompress(commitObjPath)).split("\n")
+	headerLst = list(itertools.takewhile(lambda x: x.startswith("tree\x00") or x.startswith("parent\x00"), commitContentLst))
+	commitMsg = "\n".join(commitContentLst[len(headerLst):])
+	commitMsg = commitMsg[1:-1] if len(commitMsg) >= 2 and commitMsg.startswith("'") and commitMsg.endswith("'") else commitMsg
+	return (headerLst[0].split("\x00")[1], list(map(lambda x: x.split("\x00")[1], headerLst[1:])), commitMsg)
+
+#Check if the provided commit contains the ancestor commit, i.e. the ancestor commit is the commit itself or can be reached from it through its parents
+#The history is walked iteratively so that long imported histories do not run into the recursion limit
+def isAncestorCommit(ancestorCommit, commitHash):
+	visitedSet, pendingLst = set(), [commitHash]
+	while pendingLst:
+		currCommit = pendingLst.pop()
+		if currCommit == ancestorCommit:
+			return True
+		if currCommit not in visitedSet:
+			visitedSet.add(currCommit)
+			pendingLst.extend(parseCommitObject(currCommit)[1])
+	return False
+
+#Recursively compare two tree objects as a sorted merge-join over their entries and collect the files that were modified ('M', path, blobHash) or deleted ('D', path, "")
+#Sub-trees with the same hash on both sides are identical and are skipped without being read
+def recursivelyDiffTrees(oldTreeHash, newTreeHash, rootPath, changeLst):
+	if oldTreeHash == newTreeHash:
+		return
+	for entryName, entryType, entryHashes in joinTreeEntries([oldTreeHash, newTreeHash]):
+		entryPath = rootPath + "/" + entryName if rootPath else entryName
+		if entryType == "tree":
+			recursivelyDiffTrees(entryHashes[0], entryHashes[1], entryPath, changeLst)
+		elif entryHashes[1] == "":
+			changeLst.append(("D", entryPath, ""))
+		elif entryHashes[0] != entryHashes[1]:
+			changeLst.append(("M", entryPath, entryHashes[1]))
+
+#Get the commits reachable from the provided tip commits in topological order, i.e every commit comes after all of its parents, along with the parsed commit objects
+#Each commit is tagged with the ref of the first tip it was reached from. An explicit stack is used since the history can be far deeper than the recursion limit
+def getCommitsInTopologicalOrder(tipLst):
+	orderedLst, commitDict, commitStack = [], {}, list(map(lambda x: (x[1], x[0], False), reversed(tipLst)))
+	while commitStack:
+		commitHash, refName, parentsDone = commitStack.pop()
+		if parentsDone:
+			orderedLst.append((commitHash, refName))
+		elif commitHash not in commitDict:
+			commitDict[commitHash] = parseCommitObject(commitHash)
+			commitStack.append((commitHash, refName, True))
+			commitStack.extend(map(lambda x: (x, refName, False), reversed(list(filter(lambda x: x not in commitDict, commitDict[commitHash][1])))))
+	return (orderedLst, commitDict)
+
+#Read the next command line of the (binary) fast-import stream as text
+def readFastImportLine(stream):
+	return decodeText(stream.readline())
+
+#Read the payload of a 'data' command of the fast-import stream as bytes, given either as an exact byte count (data <count>) or up to a delimiter line (data <<delimiter)
+def readFastImportData(stream, dataLine):
+	if not dataLine.startswith("data "):
+		raise FastImportError("Expected 'data n' command, found: " + dataLine.rstrip("\n"))
+	dataArg = dataLine[len("data "):].strip()
+	if not dataArg.startswith("<<"):
+		try:
+			dataLength = int(dataArg)
+		except ValueError:
+			raise FastImportError("Invalid data length: " + dataArg)
+		if dataLength < 0:
+			raise FastImportError("Invalid data length: " + dataArg)
+		dataContent = stream.read(dataLength)
+		if len(dataContent) < dataLength:
+			raise FastImportError("EOF in data (" + str(dataLength - len(dataContent)) + " bytes remaining)")
+		return dataContent
+	lineLst, line = [], stream.readline()
+	while line != b"" and decodeText(line).rstrip("\n") != dataArg[2:]:
+		lineLst.append(line)
+		line = stream.readline()
+	return b"".join(lineLst)
+
+#Write a git object created by fast-import unless it was already written during this import. The objects are written as loose objects without being
+#flushed to disk one by one, the refs are only updated once all of the objects they reach have been written
+def writeFastImportObject(objHash, objContent, importState, fileContent=None):
+	if objHash not in importState["WrittenObjects"]:
+		writeGitObject(objHash, compressGitObject(objContent, fileContent))
+		importState["WrittenObjects"].add(objHash)
+	return objHash
+
+#Resolve a data reference of the fast-import stream, either a mark (:<number>) or an object hash, to the object hash. The commit references of the from, merge
+#and reset commands can also name a ref (eg. refs/heads/master), which is looked up in the refs imported so far and then in the repository
+def resolveFastImportDataRef(dataRef, importState, isCommitRef=False):
+	if dataRef.startswith(":"):
+		if dataRef not in importState["Marks"]:
+			raise FastImportError("mark " + dataRef + " not declared")
+		return importState["Marks"][dataRef]
+	objHash = dataRef.lower() if isObjectHash(dataRef) else ""
+	if objHash == "" and isCommitRef:
+		refName = normalizeRefName(dataRef)
+		objHash = importState["Branches"][refName][0] if refName in importState["Branches"] else resolveRef(refName)
+	if objHash == "" or not os.path.isfile(os.path.join(currDir, ".git", "objects", objHash[:2], objHash[2:])):
+		raise FastImportError("Invalid ref name or SHA1 expression: " + dataRef)
+	return objHash
+
+#Get the sub-tree with the provided name from the in-memory tree object, creating an empty one if it does not exist yet
+def getOrCreateSubDirTree(dirTreeObj, dirName):
+	matchLst = list(filter(lambda x: x.CurrDir == dirName, dirTreeObj.DirTreeLst))
+	if matchLst:
+		return matchLst[0]
+	dirTreeObj.DirTreeLst.append(DirTree(dirName))
+	return dirTreeObj.DirTreeLst[-1]
+
+#Point the file at the provided path (as a list of path components) to the blob hash in the in-memory tree. Every tree on the path is marked as modified by
+#clearing its hash, the untouched sub-trees keep their hash and are not written again
+def setFileInDirTree(dirTreeObj, pathParts, blobHash):
+	dirTreeObj.CurrDirHash = ""
+	if len(pathParts) == 1:
+		dirTreeObj.FileHashMap[pathParts[0]] = blobHash
+	else:
+		setFileInDirTree(getOrCreateSubDirTree(dirTreeObj, pathParts[0]), pathParts[1:], blobHash)
+
+#Delete the file or directory at the provided path (as a list of path components) from the in-memory tree, marking the trees on the path as modified
+def deletePathFromDirTree(dirTreeObj, pathParts):
+	dirTreeObj.CurrDirHash = ""
+	if len(pathParts) == 1:
+		dirTreeObj.FileHashMap.pop(pathParts[0], None)
+		dirTreeObj.DirTreeLst = list(filter(lambda x: x.CurrDir != pathParts[0], dirTreeObj.DirTreeLst))
+	else:
+		list(map(lambda x: deletePathFromDirTree(x, pathParts[1:]), filter(lambda x: x.CurrDir == pathParts[0], dirTreeObj.DirTreeLst)))
+
+#Recursively write the tree objects of the in-memory tree that were modified since they were last written. The entries are sorted on their name and the
+#sub-trees that ended up empty are dropped from their parent. Returns the hash of the provided tree, which is empty for an empty sub-tree
+def writeFastImportTree(dirTreeObj, importState, isRootTree=False):
+	if dirTreeObj.CurrDirHash != "":
+		return dirTreeObj.CurrDirHash
+	list(map(lambda x: writeFastImportTree(x, importState), dirTreeObj.DirTreeLst))
+	dirTreeObj.DirTreeLst = sorted(filter(lambda x: x.CurrDirHash != "", dirTreeObj.DirTreeLst), key=lambda x: x.CurrDir)
+	content = list(map(lambda x: "040000\x00tree\x00" + x.CurrDirHash + "\x00" + x.CurrDir, dirTreeObj.DirTreeLst))
+	content = content + list(map(lambda x: "100644\x00blob\x00" + dirTreeObj.FileHashMap[x] + "\x00" + x, sorted(dirTreeObj.FileHashMap)))
+	contentToWrite = encodeText("\n".join(content))
+	if contentToWrite != b"" or isRootTree:
+		dirTreeObj.CurrDirHash = writeFastImportObject(sha1(contentToWrite).hexdigest(), contentToWrite, importState)
+	return dirTreeObj.CurrDirHash
+
+#Get the commit and the in-memory tree that a new commit on the provided ref of the fast-import stream starts from. Without an explicit 'from' the commit continues
+#the ref, either as imported so far or as found in the repository. The in-memory tree of the ref is modified in place when it continues from its own tip and copied
+#from another ref's tree (or loaded from the repository) otherwise
+def getFastImportBaseTree(refName, fromCommit, importState):
+	branchDict = importState["Branches"]
+	if fromCommit is None:
+		fromCommit = branchDict[refName][0] if refName in branchDict else importState["OriginalRefs"].get(refName, "")
+	if fromCommit == "":
+		return ("", DirTree(""))
+	if refName in branchDict and branchDict[refName][0] == fromCommit and branchDict[refName][1] is not None:
+		return branchDict[refName]
+	matchLst = list(filter(lambda x: x[0] == fromCommit and x[1] is not None, branchDict.values()))
+	if matchLst:
+		return (fromCommit, copy.deepcopy(matchLst[0][1]))
+	return (fromCommit, parseFileAndMakeDirTreeObject(getRootTreeHashFromCommit(fromCommit), ""))
+
+#Point a ref updated by the fast-import stream to its new commit. While holding the ref's lock its current value is read again from the repository and, unless
+#forced, the update is refused if another process has moved the ref since the import read it, or if the new commit does not contain the commit the ref points to
+#(like git, an import never silently drops history). Returns the reason if the update was refused, otherwise an empty string
+def updateFastImportRef(refName, importState, force):
+	newCommit, origCommit = importState["Branches"][refName][0], importState["OriginalRefs"].get(refName, "")
+	def checkRefUpdate():
+		global packedRefsLst
+		refCache.pop(refName, None)
+		packedRefsLst = None
+		currCommit = resolveRef(refName)
+		if force or currCommit == "" or currCommit == newCommit:
+			return ""
+		if currCommit != origCommit:
+			return "Not updating " + refName + " (it was moved to " + currCommit + " by another process during the import)"
+		if not isAncestorCommit(currCommit, newCommit):
+			return "Not updating " + refName + " (new tip " + newCommit + " does not contain " + currCommit + ")"
+		return ""
+	refusalReason = writeFileWithLock(getRefFilePath(refName), newCommit, checkRefUpdate)
+	if refusalReason == "":
+		refCache[refName], importState["OriginalRefs"][refName] = newCommit, newCommit
+	return refusalReason
+
+#Point all the refs that were updated by the fast-import stream to their new commits. The refs whose update was refused are recorded along with the reason
+def updateFastImportRefs(importState, force):
+	updatedRefLst = list(filter(lambda x: importState["Branches"][x][0] not in ("", importState["OriginalRefs"].get(x, "")), importState["Branches"]))
+	refusalDict = dict(map(lambda x: (x, updateFastImportRef(x, importState, force)), updatedRefLst))
+	importState["RefusedRefs"].update(filter(lambda x: x[1] != "", refusalDict.items()))
+	list(map(lambda x: importState["RefusedRefs"].pop(x, None), filter(lambda x: refusalDict[x] == "", refusalDict)))
 
 # Git Functionality Methods
 
@@ -500,49 +1029,87 @@ def init(isBare):
 #	3. Generate blob objects for each of the files in the file list
 #	4. If the index already contains files present in the list of files to git add, then update their entries in the index
 #	5. If the index already contains fiels present in the list of files to git delete, then delete their entries from the index
+@withIndexLock
 def add(fileOrDirectory, addFromCommit=False, fullPathProvided=False):	
 	if not fullPathProvided:
 		fullFileOrDirectory = os.path.join(currDir, fileOrDirectory)
 	else:
 		fullFileOrDirectory = fileOrDirectory
 	if not os.path.isfile(fullFileOrDirectory) and not os.path.isdir(fullFileOrDirectory):
-		print "Invalid file(s). Cannot add to git"
+		print("Invalid file(s). Cannot add to git")
 		return
 	filesToGitAdd = getFilesToGitAdd(fullFileOrDirectory)
 	if addFromCommit and indexFileExists():
 		idxFileContent = readFromFile(os.path.join(currDir, ".git", "index"))
-		filesToGitAdd = filter(lambda x: x in idxFileContent, filesToGitAdd)
-	contentAndHashWithRelPathLst = map(makeGitCompressedContentAndHashWithRelPath, filesToGitAdd)
-	map(writeGitBlobObjects, contentAndHashWithRelPathLst)	
-	map(updateGitIndexFileWithModifications, contentAndHashWithRelPathLst)
+		filesToGitAdd = list(filter(lambda x: x in idxFileContent, filesToGitAdd))
+	contentAndHashWithRelPathLst = list(map(makeGitCompressedContentAndHashWithRelPath, filesToGitAdd))
+	list(map(writeGitBlobObjects, contentAndHashWithRelPathLst))	
+	list(map(updateGitIndexFileWithModifications, contentAndHashWithRelPathLst))
 	updateGitIndexFileWithDeletions(fullFileOrDirectory)
 
+#The base function representing the git sparse-checkout set and disable commands
+#The sequence of actions here are:
+#	1. Before doing anything check if there are any pending changes, either added (reflected in the index) but not committed or not added at all. If yes then abort
+#	2. Remove the files of the latest commit that are part of the current sparse checkout from the working copy
+#	3. Write the provided directory prefixes to the sparse checkout file. An empty list disables the sparse checkout and removes the file
+#	4. Apply the latest commit to the working copy again, this time only materializing the files under the new directory prefixes, and regenerate the index from it
+@withIndexLock
+def sparseCheckout(patternLst):
+	if diffIndexAndLocal() or diffLatestCommitAndIndex():
+		return "There are unstaged or uncommited changes present in working copy. Sparse checkout aborted."
+	global sparsePatternLst
+	latestCommit = getLatestCommitForCurrentBranch()
+	rootTreeObj = makeDirTreeObjectFromCommit(latestCommit) if latestCommit != "" else None
+	if rootTreeObj is not None:
+		recursivelyDeleteCommitFromWorkingCopy(rootTreeObj, os.path.split(currDir)[0])
+	sparseFilePath = os.path.join(currDir, ".git", sparseCheckoutFileName)
+	if patternLst:
+		writeToFile(sparseFilePath, "".join(map(lambda x: x + "\n", patternLst)))
+	else:
+		deleteFileIfExists(sparseFilePath)
+	sparsePatternLst = None
+	if rootTreeObj is not None:
+		recursivelyApplyCommitToWorkingCopy(rootTreeObj, os.path.split(currDir)[0])
+		newIndexContent = "\n".join(recursivelyPrepareIndexFromCommit(rootTreeObj, "")) + "\x00\n"
+		writeIndexFile(newIndexContent)
+	if not getSparseCheckoutPatterns():
+		return "Sparse checkout disabled. Working copy contains all files"
+	return "Sparse checkout updated. Working copy limited to: " + ", ".join(getSparseCheckoutPatterns())
+
 #The base function representing the git cat-file command
 #The sequence of actions here are:
 #	1. Check if the input file provided is actually the index file in which case display its content
 #	2. Otherwise for any other blob or tree object, get a hold of its file path in the git directory
-#	3. Using the path generate the uncompressed content of the object and return the string content
+#	3. Using the path generate the uncompressed content of the object and return it as bytes
 def catFile(fileName):
 	if fileName == "index":
-		return readFromFile(os.path.join(currDir, ".git", "index"))		
+		return readFromFile(os.path.join(currDir, ".git", "index"), 'rb')
 	objFolderName = fileName[:2]
 	dirToSearch = os.path.join(currDir, ".git", "objects",  objFolderName)
 	objFileNameStart = fileName[2:]
 	if len(fileName) <= 2 or not os.path.isdir(dirToSearch):
 		return		
-	(_, _, fileLst) = os.walk(dirToSearch).next()
-	resultLst = filter(lambda x: x.startswith(objFileNameStart), fileLst)
+	(_, _, fileLst) = next(os.walk(dirToSearch))
+	resultLst = list(filter(lambda x: x.startswith(objFileNameStart), fileLst))
 	if resultLst:		
 		return readFromFileAndDecompress(os.path.join(dirToSearch, resultLst[0]))
 
 #The base function representing the git commit command
 # The sequence of actions here are:
-#	1. If the user wishes to add files before commiting then we do both add and commit operations
-#	2. Otherwise invoke the core makeGitCommit function with the user provided commit message
+#	1. Under the index lock, check if there is anything to commit. If the user wishes to commit all changes (added and unadded) then we check if there is any difference
+#		between the index and the local working copy, otherwise between the index and the latest commit. If no, then we stop the commit operation saying no files to commit.
+#		The check is done after taking the lock so that concurrent commits of the same index cannot both pass it
+#	2. If the user wishes to add files before commiting then we do both add and commit operations
+#	3. Otherwise invoke the core makeGitCommit function with the user provided commit message
+@withIndexLock
 def commit(addFirst, commitMsg="Default Commit Message"):
+	pendingChangesLst = diffIndexAndLocal() if addFirst else diffLatestCommitAndIndex()
+	if not pendingChangesLst and getLatestCommitForCurrentBranch() != "":
+		return "There are no file(s) to commit"
 	if addFirst:
 		add(currDir)
 	makeGitCommit(commitMsg)
+	return "File(s) committed successfully"
 
 #The base function representing the git diff command
 #The sequence of actions here are:
@@ -569,67 +1136,88 @@ def diff(isCached, isHead, branchName="", commitID=""):
 
 #The base function representing the git branch command
 #The sequence of actions here are:
-#	1. Get the full branch path from the provided branch name and check if such a branch already exists
-#	2. If not then we check if the user has created atleast one branch. If not then we break, else continue
-#	3. We get the current branch and its associated latest commit
-#	4. We create the new branch with its full branch path and point it to the latest commit
+#	1. Get the ref from the provided branch name and check if such a branch already exists (either as a loose ref or in packed-refs)
+#	2. If not then we check if the user has created atleast one commit on the current branch. If not then we break, else continue
+#	3. We create the new branch ref under a lock file and point it to the latest commit of the current branch
 def branch(branchName):
-	branchPath = os.path.join(currDir, ".git", "refs", "heads", branchName)
-	currBranchPath = os.path.join(currDir, ".git", readFromFile(os.path.join(currDir, ".git", "HEAD")).split()[1])
-	if os.path.isfile(branchPath):
+	branchRef = "refs/heads/" + branchName
+	if resolveRef(branchRef) != "":
 		return "Branch Already exists"
-	elif not os.path.isfile(currBranchPath):	
+	currBranchCommit = getLatestCommitForCurrentBranch()
+	if currBranchCommit == "":
 		return "No branch currently checked out. Cannot create new branch"
-	currBranchCommit = readFromFile(currBranchPath)
-	writeToFile(branchPath, currBranchCommit, 'w')
+	updateRef(branchRef, currBranchCommit)
 	return "New branch " + branchName + " created successfully"
 
+#The base function representing the git branch --list command
+#The sequence of actions here are:
+#	1. Enumerate all the branch refs, both loose and packed, without reading the individual ref files
+#	2. Return the branch names one per line, marking the currently checked out branch with a '*'
+def listBranches():
+	headRef = getHeadRef()
+	return "\n".join(map(lambda x: ("* " if x == headRef else "  ") + x[len("refs/heads/"):], listRefs("refs/heads/")))
+
+#The base function representing the git pack-refs command
+#The sequence of actions here are:
+#	1. Collect all the loose refs along with the already packed refs, the loose refs taking precedence
+#	2. Write them sorted on the ref name to the packed-refs file under a lock so that lookups can binary search the file
+#	3. Delete the loose ref files that are now represented in the packed-refs file, skipping those that another process has moved in the meanwhile
+def packRefs():
+	global packedRefsLst
+	packedRefsLst = None
+	looseRefLst = list(filter(lambda x: os.path.isfile(getRefFilePath(x)), listRefs("refs/")))
+	refDict = dict(readPackedRefs())
+	refDict.update(map(lambda x: (x, resolveRef(x)), looseRefLst))
+	contentToWrite = "# pack-refs with: sorted\n" + "".join(map(lambda x: refDict[x] + " " + x + "\n", sorted(refDict)))
+	writeFileWithLock(os.path.join(currDir, ".git", packedRefsFileName), contentToWrite)
+	packedRefsLst = sorted(refDict.items())
+	list(map(lambda x: pruneLooseRef(x, refDict[x]), looseRefLst))
+	return "Packed " + str(len(refDict)) + " ref(s)"
+
 #The base function used for getting the current branch on a particular repo
 #The sequence of actions here are:
 #	1. Get the contents of the HEAD file which represent the current branch
 #	2. Return the branch acquired in the previous step
 def currentBranch():
-	currBranchPath = readFromFile(os.path.join(currDir, ".git", "HEAD")).split()[1]
-	return currBranchPath
+	headRef = getHeadRef()
+	return headRef if headRef is not None else getHeadContent()
 
 #The base function for getting the latest commit for the branch provided as user input
 #The sequence of actions here are:
 #	1. If the user has not explicitly provided a branch name then we pull the latest commit for the current branch
-#	2. If the user has provided a branch name, we use it to generate a full branch path and validate if its a correct branch
-#	3. If yes, then we retrieve the latest commit pointed to by this branch and return to the user
+#	2. If the user has provided a branch name, we resolve its ref (loose or packed) and validate if its a correct branch
+#	3. If yes, then we return the latest commit pointed to by this branch to the user
 def latestCommitByBranch(branchName=""):	
 	if not branchName:
 		return getLatestCommitForCurrentBranch()
-	else:
-		commitPath = os.path.join(currDir, ".git", "refs", "heads", branchName)
-		if not os.path.isfile(commitPath):
-			return "Invalid branch name"
-		currBranchCommit = readFromFile(commitPath)
+	currBranchCommit = resolveRef("refs/heads/" + branchName)
+	if currBranchCommit == "":
+		return "Invalid branch name"
 	return currBranchCommit
 
 #The base function for checking out a git branch. This corresponds to the git checkout function.
 #The sequence of actions here are:
 #	1. Get the current branch that the user is working on by reading the contents of the HEAD file
-#	2. Get the full path of the branch corresponding to the name provided in the input
+#	2. Get the ref of the branch corresponding to the name provided in the input
 #	3. If the branch aquired above is the same as the current branch, then no action needs to performed
-#	4. If the branch provided by the user does not correspond to a valid branch path, then the checkout operation cannot be performed
+#	4. If the branch provided by the user does not resolve to a commit, then the checkout operation cannot be performed
 #	5. Check if there are any pending changes in working copy, if yes then prevent the user from checking out a new branch since that can override these changes
 #	6. Check if there are changes added for commit but not yet committed, if yes then prevent the user from checking out a new branch since that can override the index file
 #	7. For both the current branch and the user provided branch, get the latest commit. Using these two commits invoke the removeOldCommitAndApplyNewCommit function
 #	8. Once the commit for the user provided branch has been applied to the working copy, update the contents of the HEAD file to point to new checked out branch
+@withIndexLock
 def checkout(branchName):	
-	branchPath = os.path.join(currDir, ".git", "refs", "heads", branchName)
-	currBranchPath = os.path.join(currDir, ".git", readFromFile(os.path.join(currDir, ".git", "HEAD")).split()[1])
-	if branchPath == currBranchPath:
+	branchRef = "refs/heads/" + branchName
+	if branchRef == getHeadRef():
 		return "Already on branch " + branchName
-	if not os.path.isfile(branchPath):
+	if resolveRef(branchRef) == "":
 		return "The provided branch name does not exist. Checkout failed."
 	if diffIndexAndLocal() != []:
 		return "There are changes in working copy that are not yet added to git. Add and commit those changes before checking out a new branch"
 	if diffLatestCommitAndIndex() != []:
 		return "There are staged changes pending for commit. Please commit them before checking out a new branch"
 
-	newCommit, oldCommit = readFromFile(branchPath), readFromFile(currBranchPath)
+	newCommit, oldCommit = resolveRef(branchRef), getLatestCommitForCurrentBranch()
 	removeOldCommitAndApplyNewCommit(newCommit, oldCommit)
 	updateHeadWithNewCurrentBranch(branchName)
 	return "Switched to branch " + branchName + " : Branch and working copy at commit " + newCommit
@@ -647,7 +1235,8 @@ def checkout(branchName):
 #		is a descendant of the current branch. This means that there is a linear history between the two branches resulting in a straight forward merge. All that needs to be done is to make the current branch point to the latest commit
 #		of the provided branch and the merge operation is completed.
 #	8. If there is no direct relationship between the two branches then that means a commit intermittent in the ancestory chain relates the two branches. We find and extract that commit
-#	9. With the three commits, current branch latest, provided branch latest and the common commit, we compare the changes according to the policy detailed in the blog post. If there are are any conflicts, we halt the merge operation 
+#	9. With the three commits, current branch latest, provided branch latest and the common commit, we walk their trees side by side (skipping the sub-trees that the provided
+#		branch did not change) and compare the changes according to the policy detailed in the blog post. If there are are any conflicts, we halt the merge operation 
 #		and the user to resolve the conflicts before completing the merge. NOTE: Git actually creates temporary files like MERGE_HEAD, MERGE_MODE, MERGE_MSG etc when the merge halts due to conflicts. For simplicity purposes, those files
 #		are not created in this implementation
 #	10. If there are no conflicts, then we go ahead and perform a recursive merge taking changes from all the three aforementioned commits. It is done using the below steps:
@@ -656,6 +1245,7 @@ def checkout(branchName):
 #			c. For each entry in the mergeResultIdx dictionary, we add or modify the files in the working copy
 #			d. After all the deletes and updates, we use the git add command to add these files to the index
 #			e. After adding to the index, we commit the changes by performing a merge commit
+@withIndexLock
 def merge(branchName):
 	if diffIndexAndLocal() or diffLatestCommitAndIndex():
 		return "There are unstaged or uncommited changes present in working copy. Merge aborted."
@@ -670,14 +1260,14 @@ def merge(branchName):
 	currBranchCommitAncestory = getCommitAncestory(currBranchLatestCommit, [])
 	currBranchCommitChain = flattenCommitAncestory(currBranchCommitAncestory)	
 	checkIfAncestor = lambda x: x == targetBranchLatestCommit
-	ancestorCommit = filter(checkIfAncestor, currBranchCommitChain)
+	ancestorCommit = list(filter(checkIfAncestor, currBranchCommitChain))
 	# Case: 1 [No Merge]
 	if ancestorCommit:
 		return "The provided branch's latest commit is an ancestor of the current branch's latest commit. No merge required"
 	targetBranchCommitAncestory = getCommitAncestory(targetBranchLatestCommit, [])	
 	targetBranchCommitChain = flattenCommitAncestory(targetBranchCommitAncestory)
 	checkIfDescendant  = lambda x: x == currBranchLatestCommit
-	descendantCommit = filter(checkIfDescendant, targetBranchCommitChain)
+	descendantCommit = list(filter(checkIfDescendant, targetBranchCommitChain))
 	# Case: 2 [Fast Forward Merge]
 	if descendantCommit:
 		returnString = "The provided branch's latest commit is a descendant of the current branch's latest commit. Performing Fast-Forward merge.\n"
@@ -687,10 +1277,8 @@ def merge(branchName):
 		return returnString
 	# Case: 3 [No Merge due to Conflicts]
 	filterCommonAncestorCommit = lambda x: x in currBranchCommitChain
-	commonAncestorCommit = filter(filterCommonAncestorCommit, targetBranchCommitChain)[0]
-	generateIndexForCommit = lambda x: recursivelyGenerateFileHashMap(makeDirTreeObjectFromCommit(x), os.path.split(currDir)[0], True)	
-	targetBranchIdx, currBranchIdx, commonAncestorIdx = map(generateIndexForCommit, [targetBranchLatestCommit, currBranchLatestCommit, commonAncestorCommit])
-	returnValue, conflictExists = generateResultIndexForMerge(targetBranchIdx, currBranchIdx, commonAncestorIdx)
+	commonAncestorCommit = list(filter(filterCommonAncestorCommit, targetBranchCommitChain))[0]
+	returnValue, conflictExists = generateResultIndexForMerge(targetBranchLatestCommit, currBranchLatestCommit, commonAncestorCommit)
 	mergeResultIdx, conflictsLst, deletedFilesLst = returnValue["ResultIndex"], returnValue["ConflictsList"], returnValue["DeletedList"]
 	if conflictExists:
 		returnString = "There exists conflict(s) between current branch and target branch. Following are the conflicting files: \n"
@@ -699,17 +1287,134 @@ def merge(branchName):
 		return returnString
 		
 	# Case: 4 [Recursive Merge]	
-	map(deleteFileIfExists, deletedFilesLst)
+	list(map(deleteFileIfExists, deletedFilesLst))
 	filePathPrefix = os.path.join(currDir, ".git", "objects")
-	writeMergeContentToWorkingCopy = lambda x: writeToFile(x, extractOriginalContent(readFromFileAndDecompress(os.path.join(filePathPrefix, mergeResultIdx[x][:2], mergeResultIdx[x][2:]))), 'w')
-	map(writeMergeContentToWorkingCopy, mergeResultIdx)
+	sparseMergeResultLst = list(filter(isPathInSparseCheckout, mergeResultIdx))
+	writeMergeContentToWorkingCopy = lambda x: writeWorkingCopyFile(x, extractOriginalContent(readFromFileAndDecompress(os.path.join(filePathPrefix, mergeResultIdx[x][:2], mergeResultIdx[x][2:]))))
+	list(map(writeMergeContentToWorkingCopy, sparseMergeResultLst))
 	updateIndexWithMergeChanges = lambda x: add(x, False, True)
-	map(updateIndexWithMergeChanges, mergeResultIdx)
-	map(updateGitIndexFileWithDeletions, deletedFilesLst)
+	list(map(updateIndexWithMergeChanges, sparseMergeResultLst))
+	updateIndexWithSparseMergeChanges = lambda x: updateGitIndexFileWithModifications((os.path.relpath(x, currDir), None, mergeResultIdx[x]))
+	list(map(updateIndexWithSparseMergeChanges, filter(lambda x: not isPathInSparseCheckout(x), mergeResultIdx)))
+	list(map(lambda x: updateGitIndexFileWithDeletions(x, False), deletedFilesLst))
 	mergeCommitMsg = "Merge commit from " + branchName + " to current branch"
 	makeGitCommit(mergeCommitMsg, targetBranchLatestCommit)
 	return "Merge from " + branchName + " to current branch completed successfully"
 
+#The base function representing the git fast-import command which bulk loads history from a stream of commands (a subset of the git fast-import format):
+#	blob / mark :<n> / data <count>					- store a blob, optionally naming it with a mark
+#	commit <ref> / mark / committer / data / from / merge		- create a commit on the ref (author and committer lines are accepted and ignored) followed by
+#		M 100644 <:mark|hash|inline> <path> / D <path> / deleteall		  the file changes relative to the 'from' commit
+#	reset <ref> / from <commit>						- (re)start the ref, at the provided commit or with no history
+#	checkpoint / done							- update the refs now / stop reading the stream
+#Any other command (tag, progress, feature, original-oid, R, C etc.) or file mode aborts the import without updating the refs, instead of silently losing data
+#The sequence of actions here are:
+#	1. Keep the tree of every ref being imported in memory and apply the file changes of each commit to it, without touching the index or the working copy
+#	2. For every commit, write the blobs and only the trees that were modified since the previous commit (untouched sub-trees keep their hash), then the commit object
+#	3. At a checkpoint and once the stream is done, point the refs to their new commits. The index and working copy are left as they are, like git does
+#	4. A ref is only updated if its new commit contains the commit it pointed to when the import started and no other process has moved it since, unless the import
+#		is forced. The refused refs are reported as warnings and the import fails
+def fastImport(stream, force=False):
+	importState = {"Marks": {}, "Branches": {}, "WrittenObjects": set(), "RefusedRefs": {}, "OriginalRefs": dict(map(lambda x: (x, resolveRef(x)), listRefs("refs/")))}
+	blobCount, commitCount, line = 0, 0, readFastImportLine(stream)
+	while line != "" and line.strip() != "done":
+		cmd = line.rstrip("\n")
+		line = readFastImportLine(stream)
+		if cmd == "blob":
+			mark = line.split()[1] if line.startswith("mark ") else None
+			dataLine = readFastImportLine(stream) if mark is not None else line
+			blobContent = readFastImportData(stream, dataLine)
+			finalContent = makeBlobObjectContent(blobContent)
+			blobHash = writeFastImportObject(sha1(finalContent).hexdigest(), finalContent, importState, blobContent)
+			if mark is not None:
+				importState["Marks"][mark] = blobHash
+			blobCount, line = blobCount + 1, readFastImportLine(stream)
+		elif cmd.startswith("commit "):
+			refName, mark, fromCommit, mergeLst = normalizeRefName(cmd[len("commit "):]), None, None, []
+			while line.startswith(("mark ", "author ", "committer ", "encoding ")):
+				mark = line.split()[1] if line.startswith("mark ") else mark
+				line = readFastImportLine(stream)
+			commitMsg = decodeText(readFastImportData(stream, line)).rstrip("\n")
+			line = readFastImportLine(stream)
+			while line == "\n":
+				line = readFastImportLine(stream)
+			while line.startswith(("from ", "merge ")):
+				dataRef = resolveFastImportDataRef(line.split(" ", 1)[1].strip(), importState, True)
+				fromCommit, mergeLst = (dataRef, mergeLst) if line.startswith("from ") else (fromCommit, mergeLst + [dataRef])
+				line = readFastImportLine(stream)
+			parentCommit, rootTreeObj = getFastImportBaseTree(refName, fromCommit, importState)
+			while line.startswith(("M ", "D ", "deleteall")):
+				inlineData = False
+				if line.startswith("M "):
+					_, fileMode, dataRef, filePath = line.rstrip("\n").split(" ", 3)
+					if fileMode not in ("100644", "644"):
+						raise FastImportError("Unsupported file mode " + fileMode + " for " + filePath + ". Only regular files (100644) can be imported")
+					if dataRef == "inline":
+						inlineData = True
+						blobContent = readFastImportData(stream, readFastImportLine(stream))
+						finalContent = makeBlobObjectContent(blobContent)
+						blobHash = writeFastImportObject(sha1(finalContent).hexdigest(), finalContent, importState, blobContent)
+						blobCount += 1
+					else:
+						blobHash = resolveFastImportDataRef(dataRef, importState)
+					setFileInDirTree(rootTreeObj, filePath.split("/"), blobHash)
+				elif line.startswith("D "):
+					deletePathFromDirTree(rootTreeObj, line.rstrip("\n")[len("D "):].split("/"))
+				else:
+					rootTreeObj = DirTree("")
+				line = readFastImportLine(stream)
+				if inlineData and line == "\n":
+					line = readFastImportLine(stream)
+			treeHash = writeFastImportTree(rootTreeObj, importState, True)
+			parentLst = list(filter(lambda x: x != "", [parentCommit])) + mergeLst
+			contentToWrite = "tree\x00" + treeHash + "\n" + "".join(map(lambda x: "parent\x00" + x + "\n", parentLst)) + "'" + commitMsg + "'"
+			contentToWrite = encodeText(contentToWrite)
+			commitHash = writeFastImportObject(sha1(contentToWrite).hexdigest(), contentToWrite, importState)
+			importState["Branches"][refName] = (commitHash, rootTreeObj)
+			if mark is not None:
+				importState["Marks"][mark] = commitHash
+			commitCount += 1
+		elif cmd.startswith("reset "):
+			refName, fromCommit = normalizeRefName(cmd[len("reset "):]), ""
+			if line.startswith("from "):
+				fromCommit, line = resolveFastImportDataRef(line.split(" ", 1)[1].strip(), importState, True), readFastImportLine(stream)
+			importState["Branches"][refName] = (fromCommit, None if fromCommit != "" else DirTree(""))
+		elif cmd == "checkpoint":
+			updateFastImportRefs(importState, force)
+		elif cmd != "":
+			raise FastImportError("Unsupported command: " + cmd)
+	updateFastImportRefs(importState, force)
+	resultString = "".join(map(lambda x: "warning: " + importState["RefusedRefs"][x] + "\n", sorted(importState["RefusedRefs"])))
+	resultString += "Imported " + str(blobCount) + " blob(s) and " + str(commitCount) + " commit(s) into " + str(len(importState["Branches"])) + " ref(s). The index and working copy were not updated"
+	return (resultString, not importState["RefusedRefs"])
+
+#The base function representing the git fast-export command which writes the history of all the refs as a fast-import stream
+#The sequence of actions here are:
+#	1. Collect the commits reachable from all the refs in topological order, so that a commit is always exported after its parents
+#	2. For every commit, compare its tree with the tree of its first parent (skipping identical sub-trees) to get the files it modified or deleted
+#	3. Write the blobs that were not exported yet, each with a mark, followed by the commit referring to its parents and blobs by their marks
+#	4. Finally reset every ref to the mark of its latest commit
+def fastExport(stream):
+	tipLst = list(filter(lambda x: x[1] != "", map(lambda x: (x, resolveRef(x)), listRefs("refs/"))))
+	orderedLst, commitDict = getCommitsInTopologicalOrder(tipLst)
+	markDict = {}
+	for commitHash, refName in orderedLst:
+		treeHash, parentLst, commitMsg = commitDict[commitHash]
+		changeLst = []
+		recursivelyDiffTrees(commitDict[parentLst[0]][0] if parentLst else "", treeHash, "", changeLst)
+		for blobHash in map(lambda x: x[2], filter(lambda x: x[0] == "M", changeLst)):
+			if blobHash not in markDict:
+				markDict[blobHash] = ":" + str(len(markDict) + 1)
+				blobContent = extractOriginalContent(readFromFileAndDecompress(os.path.join(currDir, ".git", "objects", blobHash[:2], blobHash[2:])))
+				stream.write(encodeText("blob\nmark " + markDict[blobHash] + "\ndata " + str(len(blobContent)) + "\n") + blobContent + b"\n")
+		markDict[commitHash] = ":" + str(len(markDict) + 1)
+		encodedCommitMsg = encodeText(commitMsg)
+		stream.write(encodeText("reset " + refName + "\n" if not parentLst else ""))
+		stream.write(encodeText("commit " + refName + "\nmark " + markDict[commitHash] + "\ncommitter PyGit <pygit> 0 +0000\ndata " + str(len(encodedCommitMsg)) + "\n") + encodedCommitMsg + b"\n")
+		stream.write(encodeText("".join(map(lambda x: ("from " if x == parentLst[0] else "merge ") + markDict[x] + "\n", parentLst))))
+		stream.write(encodeText("".join(map(lambda x: "M 100644 " + markDict[x[2]] + " " + x[1] + "\n" if x[0] == "M" else "D " + x[1] + "\n", changeLst)) + "\n"))
+	stream.write(encodeText("".join(map(lambda x: "reset " + x[0] + "\nfrom " + markDict[x[1]] + "\n\n", tipLst)) + "done\n"))
+
 #The main git handler. There probably is a better approach to handling the command line switches for Git operations, but this implementation is for educational purposes and hence no attempts have to been made to rectify it further.
 def mainGitHandler():
 	argLst = sys.argv[1:]
@@ -718,87 +1423,104 @@ def mainGitHandler():
 	elif argLst[0] == "init" and len(argLst) == 2 and argLst[1] == "--bare":
 #The user wishes to initialize the repository with Git and hence runs the git init command. We check for the presence of the 'bare' flag which would indicate the user's intention of creating a bare repository. If that is the case, no .git directory will be created and all of its contents will be added at the root level of the project.
 		init(True)
-		print "Bare Git repository initialized"
+		print("Bare Git repository initialized")
 	elif argLst[0] == "init":
 		init(False)
-		print "Git repository initialized"
+		print("Git repository initialized")
 #The user wishes to add some files to git (add entries in index) by running the git add command. If the user provides '.' instead of the file or directory name, it means we should add all files in the project directory.
 	elif argLst[0] == "add" and len(argLst) <= 1:
-		print "Please provide the file/directory to add to git"
+		print("Please provide the file/directory to add to git")
 	elif argLst[0] == "add":
 		add(argLst[1]) if argLst[1] != "." else add(currDir)
-		print "File(s) staged for commit"
+		print("File(s) staged for commit")
 #For blob objects like commit and tree objects, the user can use the git cat-file command providing the hash of the file that the user wishes to view in plain text. This command can also be used to view contents of index file.
 	elif argLst[0] == "cat-file" and len(argLst) <= 1:
-		print "Please provide the git blob object to read"
+		print("Please provide the git blob object to read")
+	elif argLst[0] == "cat-file" and catFile(argLst[1]) is None:
+		print("Not a valid object name " + argLst[1])
 	elif argLst[0] == "cat-file" and len(argLst) == 3 and argLst[2] == "-p":
 		val = catFile(argLst[1])
-		print val[val.index('\x00')+1 : ]
+		sys.stdout.buffer.write(val[val.index(b'\x00')+1 : ] + b"\n")
 	elif argLst[0] == "cat-file":
-		print catFile(argLst[1])
-#The user wishes to commit his/her changes to Git. Before completing the commit command, we perform a few preliminary checks:
-#			1. If the user wishes to commit all changes (added and unadded) then we check if there is any difference between index and the local working copy. If no, then we stop the commit operation saying no files to commit.
-#			2. If the user wishes to commit only added files (default) then we check if there is any difference between the index and the latest commit. If no, then we stop the commit operation saying no files to commit.
-#The user can also use the -m flag to provide the message for the commit.
+		sys.stdout.buffer.write(catFile(argLst[1]) + b"\n")
+#The user wishes to commit his/her changes to Git. The commit command checks under the index lock if there are any file(s) to commit before committing them
+#The user can also use the -m flag to provide the message for the commit, or -a to add all the changes first
 	elif argLst[0] == "commit" and len(argLst) <= 1:
-		ans = raw_input("You are about to perform a commit, please make sure all your working files are added in git. Continue (y/n): ")
+		ans = input("You are about to perform a commit, please make sure all your working files are added in git. Continue (y/n): ")
 		if ans.lower() == "y":
-			if not diffLatestCommitAndIndex() and getLatestCommitForCurrentBranch() != "":
-				print "There are no file(s) to commit"
-				return
-			commit(False)
-		print "File(s) committed successfully"
+			print(commit(False))
 	elif argLst[0] == "commit" and argLst[1] == '-m':
-		if not diffLatestCommitAndIndex() and getLatestCommitForCurrentBranch() != "":
-			print "There are no file(s) to commit"
-			return
-		commit(False, argLst[2])	
-		print "File(s) committed successfully"
+		print(commit(False, argLst[2]))
 	elif argLst[0] == "commit" and argLst[1] == '-a':
-		if not diffIndexAndLocal() and getLatestCommitForCurrentBranch() != "":
-			print "There are no file(s) to commit"
-			return		
-		commit(True)	
-		print "File(s) committed successfully"
+		print(commit(True))
 #The user wishes to view the difference of state between either:
 #			1. Working copy and index
 #			2. Working copy and latest commit
 #			3. Index and latest commit					
 	elif argLst[0] == "diff" and len(argLst) <= 1:
-		print diff(False, False)
-		print "Diff performed successfully"
+		print(diff(False, False))
+		print("Diff performed successfully")
 	elif argLst[0] == "diff" and argLst[1] == "--cached":
-		print diff(True, False)
-		print "Diff performed successfully"
+		print(diff(True, False))
+		print("Diff performed successfully")
 	elif argLst[0] == "diff" and argLst[1] == "HEAD":
-		print diff(False, True)
-		print "Diff performed successfully"
+		print(diff(False, True))
+		print("Diff performed successfully")
 	elif argLst[0] == "diff" and argLst[1] == "-b":
-		print diff(False, False, branchName=argLst[2])
-		print "Diff performed successfully"
+		print(diff(False, False, branchName=argLst[2]))
+		print("Diff performed successfully")
 	elif argLst[0] == "diff" and argLst[1] == "-c":
-		print diff(False, False, commitID=argLst[2])
-		print "Diff performed successfully"
+		print(diff(False, False, commitID=argLst[2]))
+		print("Diff performed successfully")
+#The user wishes to list all the branches using the branch command without a branch name or with the --list flag
+	elif argLst[0] == "branch" and (len(argLst) == 1 or argLst[1] == "--list"):
+		print(listBranches())
 #The user wishes to create a new branch using the branch command
 	elif argLst[0] == "branch" and len(argLst) == 2:
-		print branch(argLst[1])
+		print(branch(argLst[1]))
+#The user wishes to move all the loose refs into the packed-refs file for faster lookups and listing
+	elif argLst[0] == "pack-refs":
+		print(packRefs())
+#The user wishes to limit the working copy to the provided directories, list those directories or go back to a full working copy using the sparse-checkout command
+	elif argLst[0] == "sparse-checkout" and len(argLst) >= 3 and argLst[1] == "set":
+		print(sparseCheckout(argLst[2:]))
+	elif argLst[0] == "sparse-checkout" and len(argLst) == 2 and argLst[1] == "disable":
+		print(sparseCheckout([]))
+	elif argLst[0] == "sparse-checkout" and len(argLst) == 2 and argLst[1] == "list":
+		print("\n".join(getSparseCheckoutPatterns()))
+	elif argLst[0] == "sparse-checkout":
+		print("The sparse-checkout command requires one of: set <directories>, list or disable")
+#The user wishes to bulk load history from a fast-import stream provided on the standard input, or to write the whole history as such a stream to the standard output
+#Both streams are binary so that blob contents are passed through unchanged. With --force fast-import also updates refs whose history it does not contain
+	elif argLst[0] == "fast-import":
+		importResult, refsUpdated = fastImport(sys.stdin.buffer, len(argLst) == 2 and argLst[1] == "--force")
+		print(importResult)
+		if not refsUpdated:
+			sys.exit(1)
+	elif argLst[0] == "fast-export":
+		fastExport(sys.stdout.buffer)
 #The user wishes to checkout a particular branch from the list of already created branches
 	elif argLst[0] == "checkout" and len(argLst) == 2:
-		print checkout(argLst[1])
+		print(checkout(argLst[1]))
 #The user wishes to query which is the current branch that is checked out in the project		
 	elif argLst[0] == "current_branch":
-		print currentBranch()
+		print(currentBranch())
 #The user wishes to view the hash of the latest commit for a particular branch		
 	elif argLst[0] == "latest_commit" and len(argLst) == 3 and argLst[1] == "branch_name":
-		print latestCommitByBranch(argLst[2])
+		print(latestCommitByBranch(argLst[2]))
 	elif argLst[0] == "latest_commit":
-		print latestCommitByBranch()
+		print(latestCommitByBranch())
 #The user wishes to merge the target branch into the source or current branch		
 	elif argLst[0] == "merge" and len(argLst) == 3 and argLst[1] == "branch_name":
-		print merge(argLst[2])
+		print(merge(argLst[2]))
 	elif argLst[0] == "merge":
-		print "The merge command requires the branch name to merge to the current branch"
+		print("The merge command requires the branch name to merge to the current branch")
 
 #The main Git handler method, which routes all of the git commands to the above module
+#A lock held by another git process for longer than the lock timeout, or an unsupported fast-import stream, aborts the command with a non zero exit code
 if __name__ == "__main__":
-	mainGitHandler()		
+	try:
+		mainGitHandler()
+	except (LockTimeoutError, FastImportError) as e:
+		print("fatal: " + str(e))
+		sys.exit(128)		
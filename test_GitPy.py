@@ -0,0 +1,346 @@
+#Tests for the git engine. Every test drives GitPy.py through its command line in a temporary repository. The round trip tests check that the content of binary,
+#large and text files comes back byte for byte after the git operations, the others cover the refs, sparse checkout, locking and fast-import behaviour
+import os
+import sys
+import gzip
+import shutil
+import tempfile
+import subprocess
+import time
+import unittest
+import GitPy
+from hashlib import sha1
+
+#Path of the git engine under test, run with the same interpreter as the tests
+gitPyPath = os.path.join(os.path.dirname(os.path.abspath(__file__)), "GitPy.py")
+
+#Index entry for hello.txt (with the content and modified time set up in testOldIndexMTimeFormat) exactly as the Python 2 implementation wrote it
+oldIndexContent = b'100644\x00blob\x00edc9dc4c4d67b522b2b3c60e3d366758e5d82ae7\x000\x00hello.txt\x001500000000.12\x00\n'
+
+#Generate the files of the initial commit: MB sized random content, already compressed formats and text with NUL bytes, \r\n line endings and UTF-8
+def makeInitialFiles():
+	return {"bin/random.bin": os.urandom(3 * 1024 * 1024),
+			"bin/archive.gz": gzip.compress(b"compressible line of text\n" * 50000),
+			"img/picture.png": b'\x89PNG\r\n\x1a\n' + os.urandom(100000),
+			"text/nul.dat": b"a\x00b\x00\x00c\n" * 1000,
+			"text/crlf.txt": b"line one\r\nline two\r\n\r\nlast line without newline",
+			"text/utf8.txt": "héllo wörld ✓ 日本語\n".encode("utf-8"),
+			"top.bin": b"\r\n\x00\xff\xfe\x00\r" + os.urandom(1000) + b"\n"}
+
+class GitPyRoundTripTest(unittest.TestCase):
+
+	def setUp(self):
+		self.repoDir = tempfile.mkdtemp()
+		self.runGit("init")
+
+	def tearDown(self):
+		shutil.rmtree(self.repoDir, ignore_errors=True)
+
+	#Run a git command in the provided repository (the test repository by default), check its exit code and return its standard output as bytes
+	def runGit(self, *args, stdin=b"", repoDir=None, returnCode=0):
+		result = subprocess.run([sys.executable, gitPyPath] + list(args), cwd=repoDir or self.repoDir, input=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		self.assertEqual(result.returncode, returnCode, result.stdout + result.stderr)
+		return result.stdout
+
+	#Write the provided files (relative path => content) to the working copy and delete the ones mapped to None
+	def writeFiles(self, fileDict):
+		for relPath, content in fileDict.items():
+			filePath = os.path.join(self.repoDir, *relPath.split("/"))
+			if content is None:
+				os.remove(filePath)
+				continue
+			os.makedirs(os.path.dirname(filePath), exist_ok=True)
+			with open(filePath, "wb") as f:
+				f.write(content)
+
+	#Read all the files of the working copy (outside of the .git directory) as a dictionary of relative path => content
+	def readWorkingCopy(self):
+		fileDict = {}
+		for dirPath, dirNames, fileNames in os.walk(self.repoDir):
+			dirNames[:] = list(filter(lambda x: x != ".git", dirNames))
+			for fileName in fileNames:
+				with open(os.path.join(dirPath, fileName), "rb") as f:
+					fileDict[os.path.relpath(os.path.join(dirPath, fileName), self.repoDir).replace(os.sep, "/")] = f.read()
+		return fileDict
+
+	#Write the provided file changes, add them and commit them with the provided message
+	def commitFiles(self, fileDict, commitMsg):
+		self.writeFiles(fileDict)
+		self.runGit("add", ".")
+		self.runGit("commit", "-m", commitMsg)
+
+	#Check that the working copy holds exactly the expected files, and that it matches the index
+	def assertWorkingCopy(self, expectedFileDict):
+		workingCopyDict = self.readWorkingCopy()
+		self.assertEqual(sorted(workingCopyDict), sorted(expectedFileDict))
+		list(map(lambda x: self.assertTrue(workingCopyDict[x] == expectedFileDict[x], x + " differs"), expectedFileDict))
+		self.assertIn(b"There are no changes to display", self.runGit("diff"))
+
+	#Build a history of two branches with a merge commit, checking the working copy byte for byte after every checkout and after the merge
+	def makeBranchHistory(self):
+		masterFileDict = makeInitialFiles()
+		self.commitFiles(masterFileDict, "initial")
+		self.runGit("branch", "side")
+		self.runGit("checkout", "side")
+		sideChanges = {"bin/random.bin": os.urandom(2 * 1024 * 1024), "text/crlf.txt": b"\r\n\r\nchanged\x00\r\n", "side/new.png": b'\x89PNG\r\n\x1a\n' + os.urandom(5000)}
+		self.commitFiles(sideChanges, "side changes")
+		sideFileDict = dict(masterFileDict, **sideChanges)
+		self.assertWorkingCopy(sideFileDict)
+		self.runGit("checkout", "master")
+		self.assertWorkingCopy(masterFileDict)
+		masterChanges = {"text/utf8.txt": "über ångström\r\n".encode("utf-8"), "top.bin": None}
+		self.commitFiles(masterChanges, "master changes")
+		masterFileDict.update(masterChanges)
+		del masterFileDict["top.bin"]
+		self.runGit("checkout", "side")
+		self.assertWorkingCopy(sideFileDict)
+		self.runGit("checkout", "master")
+		self.assertWorkingCopy(masterFileDict)
+		self.assertIn(b"completed successfully", self.runGit("merge", "branch_name", "side"))
+		mergedFileDict = dict(sideFileDict, **masterChanges)
+		del mergedFileDict["top.bin"]
+		self.assertWorkingCopy(mergedFileDict)
+		return mergedFileDict
+
+	#add -> commit -> checkout between branches -> merge keeps every file byte for byte
+	def testCheckoutAndMergeRoundTrip(self):
+		self.makeBranchHistory()
+
+	#The content of the blobs is written to the fast-export stream unchanged, and importing the stream into a new repository and exporting it again gives
+	#the same stream byte for byte, with the same branches
+	def testFastExportImportRoundTrip(self):
+		mergedFileDict = self.makeBranchHistory()
+		exportedStream = self.runGit("fast-export")
+		list(map(lambda x: self.assertIn(b"data " + str(len(x)).encode() + b"\n" + x + b"\n", exportedStream), mergedFileDict.values()))
+		importRepoDir = tempfile.mkdtemp()
+		try:
+			self.runGit("init", repoDir=importRepoDir)
+			self.runGit("fast-import", stdin=exportedStream, repoDir=importRepoDir)
+			self.assertEqual(self.runGit("fast-export", repoDir=importRepoDir), exportedStream)
+			self.assertEqual(self.runGit("branch", repoDir=importRepoDir), self.runGit("branch"))
+		finally:
+			shutil.rmtree(importRepoDir, ignore_errors=True)
+
+	#An index entry written by the Python 2 implementation stays valid: the file is not reported as modified and adding it again keeps the same hash and modified time
+	def testOldIndexMTimeFormat(self):
+		self.writeFiles({"hello.txt": b"hello\r\n\x00world\n"})
+		filePath, indexPath = os.path.join(self.repoDir, "hello.txt"), os.path.join(self.repoDir, ".git", "index")
+		os.utime(filePath, (1500000000.123456, 1500000000.123456))
+		self.assertEqual(GitPy.getFileMTime(filePath), "1500000000.12")
+		with open(indexPath, "wb") as f:
+			f.write(oldIndexContent)
+		self.assertIn(b"There are no changes to display", self.runGit("diff"))
+		self.runGit("add", ".")
+		with open(indexPath, "rb") as f:
+			self.assertEqual(f.read().split(b"\n")[0].split(b"\x00")[:6], oldIndexContent.split(b"\n")[0].split(b"\x00")[:6])
+		self.runGit("commit", "-m", "hello")
+		self.assertIn(b"There are no changes to display", self.runGit("diff", "--cached"))
+
+	#branch --list lists the loose branches with the current one marked, and follows the checked out branch
+	def testBranchList(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		self.runGit("branch", "side")
+		self.runGit("branch", "feature")
+		self.assertEqual(self.runGit("branch"), b"  feature\n* master\n  side\n")
+		self.runGit("checkout", "side")
+		self.assertEqual(self.runGit("branch", "--list"), b"  feature\n  master\n* side\n")
+		self.assertIn(b"Branch Already exists", self.runGit("branch", "feature"))
+
+	#pack-refs moves the loose refs into the sorted packed-refs file, after which the branches are still listed, resolved and checked out from it
+	def testPackedRefsLookup(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		self.runGit("branch", "side")
+		masterCommit = self.runGit("latest_commit").strip()
+		self.assertIn(b"Packed 2 ref(s)", self.runGit("pack-refs"))
+		self.assertFalse(os.path.exists(os.path.join(self.repoDir, ".git", "refs", "heads", "side")))
+		with open(os.path.join(self.repoDir, ".git", "packed-refs"), "rb") as f:
+			self.assertEqual(f.read(), b"# pack-refs with: sorted\n" + masterCommit + b" refs/heads/master\n" + masterCommit + b" refs/heads/side\n")
+		self.assertEqual(self.runGit("branch"), b"* master\n  side\n")
+		self.assertEqual(self.runGit("latest_commit", "branch_name", "side").strip(), masterCommit)
+		self.assertIn(b"Branch Already exists", self.runGit("branch", "side"))
+		self.runGit("checkout", "side")
+		self.commitFiles({"b.txt": b"b\n"}, "second")
+		self.assertNotEqual(self.runGit("latest_commit", "branch_name", "side").strip(), masterCommit)
+		self.assertEqual(self.runGit("latest_commit", "branch_name", "master").strip(), masterCommit)
+
+	#A packed-refs file written by git, with the peeled (^<hash>) line of an annotated tag, and malformed lines does not break the branch operations
+	def testPackedRefsWithPeeledAndMalformedLines(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		masterCommit = self.runGit("latest_commit").strip()
+		self.runGit("pack-refs")
+		with open(os.path.join(self.repoDir, ".git", "packed-refs"), "wb") as f:
+			f.write(b"# pack-refs with: peeled fully-peeled sorted \n" + masterCommit + b" refs/heads/master\n" + masterCommit + b" refs/heads/side\n" + b"1" * 40 +
+					b" refs/tags/v1.0\n^" + masterCommit + b"\n\nnot a ref line\nabc refs/heads/broken\n")
+		self.assertEqual(self.runGit("branch"), b"* master\n  side\n")
+		self.assertEqual(self.runGit("latest_commit", "branch_name", "side").strip(), masterCommit)
+		self.assertIn(b"Invalid branch name", self.runGit("latest_commit", "branch_name", "broken"))
+		self.assertIn(b"created successfully", self.runGit("branch", "feature"))
+		self.assertIn(b"Switched to branch side", self.runGit("checkout", "side"))
+
+	#sparse-checkout set limits the working copy to the directory prefixes (the top level files are always kept) without reporting the other files as deleted,
+	#a merge updates the files outside of the sparse checkout in the index only, and sparse-checkout disable brings back all files with the merged content
+	def testSparseCheckoutMergeAndDisable(self):
+		fileDict = {"top.txt": b"top\n", "a/x/f.txt": b"f\n", "a/k.txt": b"k\n", "b/g.bin": b"\x00g\r\n", "c/h.txt": b"h\n"}
+		self.commitFiles(fileDict, "first")
+		self.runGit("branch", "side")
+		self.assertIn(b"limited to: a/x", self.runGit("sparse-checkout", "set", "a/x"))
+		self.assertEqual(self.runGit("sparse-checkout", "list"), b"a/x\n")
+		self.assertWorkingCopy({"top.txt": b"top\n", "a/x/f.txt": b"f\n"})
+		self.assertIn(b"There are no changes to display", self.runGit("diff", "--cached"))
+		self.assertIn(b"There are no changes to display", self.runGit("diff", "HEAD"))
+		self.runGit("checkout", "side")
+		self.assertWorkingCopy({"top.txt": b"top\n", "a/x/f.txt": b"f\n"})
+		self.commitFiles({"a/x/f.txt": b"f on side\n"}, "side changes")
+		self.runGit("sparse-checkout", "disable")
+		self.commitFiles({"b/g.bin": b"\x00g on side\r\n"}, "side changes outside of the sparse checkout")
+		self.runGit("checkout", "master")
+		self.runGit("sparse-checkout", "set", "a/x")
+		self.commitFiles({"top.txt": b"top on master\n"}, "master changes")
+		self.assertIn(b"completed successfully", self.runGit("merge", "branch_name", "side"))
+		self.assertWorkingCopy({"top.txt": b"top on master\n", "a/x/f.txt": b"f on side\n"})
+		self.assertIn(b"There are no changes to display", self.runGit("diff", "--cached"))
+		self.assertIn(b"Sparse checkout disabled", self.runGit("sparse-checkout", "disable"))
+		self.assertEqual(self.runGit("sparse-checkout", "list"), b"\n")
+		self.assertWorkingCopy(dict(fileDict, **{"top.txt": b"top on master\n", "a/x/f.txt": b"f on side\n", "b/g.bin": b"\x00g on side\r\n"}))
+
+	#sparse-checkout set refuses to run while there are changes that are not committed, leaving the working copy as it is
+	def testSparseCheckoutAbortsWithPendingChanges(self):
+		self.commitFiles({"a/f.txt": b"f\n", "b/g.txt": b"g\n"}, "first")
+		self.writeFiles({"b/g.txt": b"changed\n"})
+		self.assertIn(b"Sparse checkout aborted", self.runGit("sparse-checkout", "set", "a"))
+		self.assertEqual(self.readWorkingCopy(), {"a/f.txt": b"f\n", "b/g.txt": b"changed\n"})
+		self.assertFalse(os.path.exists(os.path.join(self.repoDir, ".git", "info", "sparse-checkout")))
+
+	#A command waits for the index lock held by another process only up to core.lockTimeout, then fails without touching the index
+	def testLockTimeout(self):
+		self.writeFiles({"a.txt": b"a\n"})
+		with open(os.path.join(self.repoDir, ".git", "config"), "a") as f:
+			f.write("[core]\n\tlockTimeout = 200\n")
+		lockFilePath = os.path.join(self.repoDir, ".git", "index.lock")
+		open(lockFilePath, "w").close()
+		self.assertIn(b"fatal: Unable to create", self.runGit("add", ".", returnCode=128))
+		self.assertFalse(os.path.exists(os.path.join(self.repoDir, ".git", "index")))
+		os.remove(lockFilePath)
+		self.runGit("add", ".")
+		self.assertFalse(os.path.exists(lockFilePath))
+
+	#The index lock is reentrant: commit -a and merge run add and commit while already holding it, and the lock is released afterwards
+	def testLockReentrancy(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		self.runGit("branch", "side")
+		self.writeFiles({"a.txt": b"changed\n"})
+		self.assertIn(b"committed successfully", self.runGit("commit", "-a"))
+		self.assertIn(b"There are no file(s) to commit", self.runGit("commit", "-a"))
+		self.runGit("checkout", "side")
+		self.commitFiles({"b.txt": b"b\n"}, "side")
+		self.runGit("checkout", "master")
+		self.assertIn(b"completed successfully", self.runGit("merge", "branch_name", "side"))
+		self.assertWorkingCopy({"a.txt": b"changed\n", "b.txt": b"b\n"})
+		self.assertFalse(os.path.exists(os.path.join(self.repoDir, ".git", "index.lock")))
+
+	#Concurrent commits of the same staged changes create a single commit, the check for changes to commit is done while holding the index lock
+	def testParallelCommitsCreateOneCommit(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		self.writeFiles({"a.txt": b"changed\n"})
+		self.runGit("add", ".")
+		processLst = list(map(lambda x: subprocess.Popen([sys.executable, gitPyPath, "commit", "-m", "parallel " + str(x)], cwd=self.repoDir, stdout=subprocess.PIPE), range(4)))
+		outputLst = list(map(lambda x: x.communicate()[0], processLst))
+		self.assertEqual(len(list(filter(lambda x: b"committed successfully" in x, outputLst))), 1)
+		self.assertEqual(self.runGit("fast-export").count(b"\ncommit refs/heads/master\n"), 2)
+
+	#User files whose name starts like the temporary files of the git directory are added like any other file
+	def testTemporaryLookingFilesAreAdded(self):
+		self.writeFiles({".tmp-notes": b"notes\n", "d/.tmp-a.txt-0123abcd": b"x\n"})
+		self.runGit("add", ".")
+		with open(os.path.join(self.repoDir, ".git", "index"), "rb") as f:
+			indexContent = f.read()
+		self.assertIn(b"\x00.tmp-notes\x00", indexContent)
+		self.assertIn(b"\x00d/.tmp-a.txt-0123abcd\x00", indexContent)
+
+	#A merge writes the working copy files in place, so an overwritten file keeps its permissions and no temporary files are left in the project tree
+	@unittest.skipIf(os.name == "nt", "file permissions are not tracked on Windows")
+	def testMergeKeepsFileMode(self):
+		self.commitFiles({"run.sh": b"echo a\n", "b.txt": b"b\n"}, "first")
+		self.runGit("branch", "side")
+		self.runGit("checkout", "side")
+		self.commitFiles({"run.sh": b"echo side\n"}, "side")
+		self.runGit("checkout", "master")
+		self.commitFiles({"b.txt": b"b on master\n"}, "master")
+		os.chmod(os.path.join(self.repoDir, "run.sh"), 0o755)
+		self.assertIn(b"completed successfully", self.runGit("merge", "branch_name", "side"))
+		self.assertEqual(os.stat(os.path.join(self.repoDir, "run.sh")).st_mode & 0o777, 0o755)
+		self.assertWorkingCopy({"run.sh": b"echo side\n", "b.txt": b"b on master\n"})
+
+	#add rewrites the index once per file while holding the index lock, but only flushes the final index to disk
+	def testAddFlushesIndexOnce(self):
+		self.writeFiles(dict(map(lambda x: ("f" + str(x) + ".txt", str(x).encode()), range(50))))
+		countingScript = "import os, sys, runpy\nfsyncCount = [0]\nrealFsync = os.fsync\ndef countingFsync(fd):\n\tfsyncCount[0] += 1\n\trealFsync(fd)\nos.fsync = countingFsync\n" + \
+						"sys.argv = [sys.argv[1], 'add', '.']\nsys.path.insert(0, os.path.dirname(sys.argv[0]))\nrunpy.run_path(sys.argv[0], run_name='__main__')\nprint('fsync calls: ' + str(fsyncCount[0]))\n"
+		result = subprocess.run([sys.executable, "-c", countingScript, gitPyPath], cwd=self.repoDir, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		self.assertIn(b"fsync calls: 1\n", result.stdout, result.stderr)
+		self.assertIn(b"There are no changes to display", self.runGit("diff"))
+
+	#Input that fast-import cannot import aborts the import with an error and exit code 128 instead of being skipped, and no ref is updated
+	def testFastImportRejectsUnsupportedInput(self):
+		blobStream = b"blob\nmark :1\ndata 3\nabc\n"
+		commitStream = b"commit refs/heads/master\ndata 2\nm\n"
+		streamLst = [(blobStream + commitStream + b"R a.txt b.txt\nM 100644 :1 c.txt\n\ndone\n", b"fatal: Unsupported command: R a.txt b.txt"),
+					(blobStream + commitStream + b"C a.txt b.txt\n\n", b"fatal: Unsupported command: C a.txt b.txt"),
+					(blobStream + commitStream + b"M 100755 :1 run.sh\n\n", b"fatal: Unsupported file mode 100755 for run.sh"),
+					(blobStream + b"tag v1.0\nfrom :1\n", b"fatal: Unsupported command: tag v1.0"),
+					(b"progress importing\n", b"fatal: Unsupported command: progress importing"),
+					(b"feature done\ndone\n", b"fatal: Unsupported command: feature done"),
+					(b"blob\nmark :1\noriginal-oid 1234\ndata 3\nabc\n", b"fatal: Expected 'data n' command, found: original-oid 1234"),
+					(b"blob\ndata x\nabc\n", b"fatal: Invalid data length: x"),
+					(b"blob\ndata 10\nabc\n", b"fatal: EOF in data (6 bytes remaining)"),
+					(commitStream + b"M 100644 :7 a.txt\n\n", b"fatal: mark :7 not declared"),
+					(commitStream + b"from refs/heads/missing\n\n", b"fatal: Invalid ref name or SHA1 expression: refs/heads/missing"),
+					(commitStream + b"from " + b"1" * 40 + b"\n\n", b"fatal: Invalid ref name or SHA1 expression: " + b"1" * 40)]
+		for stream, expectedError in streamLst:
+			self.assertIn(expectedError, self.runGit("fast-import", stdin=stream, returnCode=128))
+		self.assertEqual(self.runGit("branch"), b"\n")
+
+	#The from command accepts a ref name, resolved from the refs imported so far and from the repository, and inline blobs are counted in the summary
+	def testFastImportFromRefName(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		stream = b"commit refs/heads/side\ndata 4\nside\nfrom refs/heads/master\nM 100644 inline b.bin\ndata 4\nb\x00\r\n\n" + \
+				b"commit refs/heads/third\ndata 5\nthird\nfrom refs/heads/side\nmerge refs/heads/master\n\ndone\n"
+		self.assertIn(b"Imported 1 blob(s) and 2 commit(s) into 2 ref(s)", self.runGit("fast-import", stdin=stream))
+		self.assertEqual(self.runGit("branch"), b"* master\n  side\n  third\n")
+		self.runGit("checkout", "side")
+		self.assertWorkingCopy({"a.txt": b"a\n", "b.bin": b"b\x00\r\n"})
+
+	#fast-import refuses to update a ref whose new commit does not contain the commit it points to, unless --force is given
+	def testFastImportRefusesToDropHistory(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		masterCommit = self.runGit("latest_commit").strip()
+		stream = b"reset refs/heads/master\ncommit refs/heads/master\ndata 4\nroot\nM 100644 inline b.txt\ndata 2\nb\n\ncommit refs/heads/side\ndata 4\nside\nfrom refs/heads/master\n\ndone\n"
+		importOutput = self.runGit("fast-import", stdin=stream, returnCode=1)
+		self.assertIn(b"warning: Not updating refs/heads/master (new tip ", importOutput)
+		self.assertIn(b" does not contain " + masterCommit + b")", importOutput)
+		self.assertEqual(self.runGit("latest_commit").strip(), masterCommit)
+		self.assertEqual(self.runGit("branch"), b"* master\n  side\n")
+		self.runGit("fast-import", "--force", stdin=stream)
+		self.assertNotEqual(self.runGit("latest_commit").strip(), masterCommit)
+
+	#A ref moved by another process while it is being imported is not overwritten, it is checked again under the ref lock before being updated
+	def testFastImportRefusesRefMovedDuringImport(self):
+		self.commitFiles({"a.txt": b"a\n"}, "first")
+		blobContent = b"written by the import\n"
+		blobHash = sha1(b"blob\x00" + str(len(blobContent)).encode() + b"\x00" + blobContent).hexdigest()
+		blobPath = os.path.join(self.repoDir, ".git", "objects", blobHash[:2], blobHash[2:])
+		importProcess = subprocess.Popen([sys.executable, gitPyPath, "fast-import"], cwd=self.repoDir, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+		importProcess.stdin.write(b"commit refs/heads/master\ndata 6\nimport\nM 100644 inline b.txt\ndata " + str(len(blobContent)).encode() + b"\n" + blobContent + b"\n")
+		importProcess.stdin.flush()
+		deadline = time.time() + 10
+		while not os.path.isfile(blobPath) and time.time() < deadline:
+			time.sleep(0.01)
+		self.commitFiles({"c.txt": b"c\n"}, "concurrent")
+		concurrentCommit = self.runGit("latest_commit").strip()
+		importOutput = importProcess.communicate(b"done\n")[0]
+		self.assertEqual(importProcess.returncode, 1)
+		self.assertIn(b"warning: Not updating refs/heads/master (it was moved to " + concurrentCommit, importOutput)
+		self.assertEqual(self.runGit("latest_commit").strip(), concurrentCommit)
+
+if __name__ == "__main__":
+	unittest.main()